@@ -5,6 +5,7 @@
 #     "alpha_sdk>=0.5,<1.0",
 #     "psycopg[binary]>=3.1",
 #     "pendulum>=3.0",
+#     "uvloop>=0.19",
 # ]
 #
 # [[tool.uv.index]]
@@ -31,12 +32,21 @@ Usage:
 
 import argparse
 import asyncio
+import io
 import os
 
 import pendulum
 import psycopg
+import uvloop
 
-from alpha_sdk import AlphaClient
+
+# === Database ===
+def get_database_url() -> str:
+    """DATABASE_URL, or exit saying so (rather than connect with an empty DSN)."""
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL is not set")
+    return database_url
 
 
 # === Time Period Calculation ===
@@ -68,58 +78,76 @@ def format_period_label(period: str, start: pendulum.DateTime, end: pendulum.Dat
 
 
 # === Memory Fetching ===
-def fetch_memories(database_url: str, start: pendulum.DateTime, end: pendulum.DateTime) -> list[dict]:
-    """Fetch all memories in the time range, chronologically."""
-    with psycopg.connect(database_url) as conn:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT id, content, metadata->>'created_at' as created_at
-                FROM cortex.memories
-                WHERE NOT forgotten
-                  AND (metadata->>'created_at')::timestamptz >= %s
-                  AND (metadata->>'created_at')::timestamptz < %s
-                ORDER BY (metadata->>'created_at')::timestamptz ASC
-            """, (start.to_iso8601_string(), end.to_iso8601_string()))
-
-            memories = []
-            for row in cur.fetchall():
-                dt = pendulum.parse(row[2]).in_timezone("America/Los_Angeles")
-                memories.append({
-                    "id": row[0],
-                    "content": row[1],
-                    "time": dt.format("h:mm A"),
-                })
-            return memories
+async def fetch_memories(conn: psycopg.AsyncConnection, start: pendulum.DateTime,
+                         end: pendulum.DateTime) -> list[dict]:
+    """Fetch all memories in the time range, chronologically.
+
+    Filters and sorts on cortex.memory_created_at() so Postgres can walk
+    memories_created_at_idx (sql/memories_created_at.sql) instead of casting
+    every row's JSON. Ties break on id so the same memories always render the
+    same prompt bytes, which keeps re-runs eligible for the prompt cache; the
+    index is keyed on (created_at, id), so that ordering needs no sort step.
+    """
+    async with conn.cursor() as cur:
+        await cur.execute("""
+            SELECT id, content,
+                   to_char(cortex.memory_created_at(metadata) AT TIME ZONE 'America/Los_Angeles',
+                           'FMHH12:MI AM') AS time
+            FROM cortex.memories
+            WHERE NOT forgotten
+              AND cortex.memory_created_at(metadata) >= %s
+              AND cortex.memory_created_at(metadata) < %s
+            ORDER BY cortex.memory_created_at(metadata) ASC, id ASC
+        """, (start, end))
+
+        return [{"id": row[0], "content": row[1], "time": row[2]} async for row in cur]
 
 
 # === Summary Storage & Retrieval ===
-def store_summary(database_url: str, start: pendulum.DateTime, end: pendulum.DateTime,
-                  summary: str, memory_count: int):
-    """Store the summary in cortex.summaries (upsert on conflict)."""
-    with psycopg.connect(database_url) as conn:
-        with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO cortex.summaries (period_start, period_end, summary, memory_count)
-                VALUES (%s, %s, %s, %s)
-                ON CONFLICT (period_start, period_end)
-                DO UPDATE SET summary = EXCLUDED.summary,
-                              memory_count = EXCLUDED.memory_count,
-                              created_at = NOW()
-            """, (start.to_iso8601_string(), end.to_iso8601_string(), summary, memory_count))
-            conn.commit()
-    print("Summary stored in cortex.summaries")
-
-
-def fetch_summary(database_url: str, start: pendulum.DateTime, end: pendulum.DateTime) -> str | None:
-    """Fetch a previous summary from cortex.summaries."""
-    with psycopg.connect(database_url) as conn:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT summary FROM cortex.summaries
-                WHERE period_start = %s AND period_end = %s
-            """, (start.to_iso8601_string(), end.to_iso8601_string()))
-            row = cur.fetchone()
-            return row[0] if row else None
+async def store_summary(conn: psycopg.AsyncConnection, start: pendulum.DateTime,
+                        end: pendulum.DateTime, summary: str, memory_count: int):
+    """Store the summary in cortex.summaries (upsert on conflict).
+
+    Committed when the caller's connection block exits, rolled back on error.
+    """
+    async with conn.cursor() as cur:
+        await cur.execute("""
+            INSERT INTO cortex.summaries (period_start, period_end, summary, memory_count)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (period_start, period_end)
+            DO UPDATE SET summary = EXCLUDED.summary,
+                          memory_count = EXCLUDED.memory_count,
+                          created_at = NOW()
+            RETURNING (xmax = 0) AS inserted
+        """, (start, end, summary, memory_count))
+        row = await cur.fetchone()
+    if row and row[0]:
+        print("Summary stored in cortex.summaries")
+    else:
+        print("Summary updated in cortex.summaries (replaced existing)")
+
+
+async def fetch_summaries(conn: psycopg.AsyncConnection,
+                          ranges: list[tuple[pendulum.DateTime, pendulum.DateTime]]) -> list[str | None]:
+    """Fetch previous summaries from cortex.summaries in one round trip.
+
+    Returns one entry per (start, end) range, in order; None where no summary exists.
+    """
+    if not ranges:
+        return []
+
+    starts = [start for start, _ in ranges]
+    ends = [end for _, end in ranges]
+
+    async with conn.cursor() as cur:
+        await cur.execute("""
+            SELECT s.summary
+            FROM unnest(%s::timestamptz[], %s::timestamptz[])
+                 WITH ORDINALITY AS r(period_start, period_end, n)
+            LEFT JOIN cortex.summaries s USING (period_start, period_end)
+            ORDER BY r.n
+        """, (starts, ends))
+        return [row[0] for row in await cur.fetchall()]
 
 
 def get_previous_periods(period: str, now: pendulum.DateTime) -> list[tuple[str, pendulum.DateTime, pendulum.DateTime]]:
@@ -157,9 +185,14 @@ def get_previous_periods(period: str, now: pendulum.DateTime) -> list[tuple[str,
 # === The Note From Me To Me ===
 def build_prompt(memories: list[dict], period_label: str) -> str:
     """Build the prompt—a note from me to me."""
-    memories_text = "\n\n---\n\n".join(
-        f"[{m['time']}]\n{m['content']}" for m in memories
-    )
+    buf = io.StringIO()
+    sep = ""
+    for m in memories:
+        buf.write(sep)
+        buf.write(f"[{m['time']}]\n")
+        buf.write(m["content"])
+        sep = "\n\n---\n\n"
+    memories_text = buf.getvalue()
 
     return f"""Hey me. Me here.
 
@@ -186,7 +219,11 @@ Write in past tense. No headers, no sections, no performative stretching. Just t
 
 # === Agent Execution ===
 async def run_capsule(prompt: str) -> str:
-    """Run capsule-me through AlphaClient."""
+    """Run capsule-me through AlphaClient.
+
+    The SDK imports live here so quiet periods (no memories) never load them.
+    """
+    from alpha_sdk import AlphaClient
     from claude_agent_sdk import AssistantMessage, ResultMessage
 
     print("Waking up capsule-me...")
@@ -219,7 +256,7 @@ async def async_main(period: str, date_str: str | None = None):
     print("=" * 60)
     print()
 
-    database_url = os.environ.get("DATABASE_URL", "")
+    database_url = get_database_url()
 
     # Use specified date or now
     if date_str:
@@ -240,20 +277,25 @@ async def async_main(period: str, date_str: str | None = None):
     print(f"Range: {start.to_iso8601_string()} → {end.to_iso8601_string()}")
     print()
 
-    # Fetch memories
-    memories = fetch_memories(database_url, start, end)
-    print(f"Fetched {len(memories)} memories")
-
-    if not memories:
-        print("No memories from this period!")
-        summary = f"No memories from {period_label}."
-        store_summary(database_url, start, end, summary, 0)
-        return
-
-    # Fetch previous context for continuity
-    previous_periods = get_previous_periods(period, now)
-    for label, prev_start, prev_end in previous_periods:
-        prev_summary = fetch_summary(database_url, prev_start, prev_end)
+    # One connection for the reads, closed before the (multi-minute) LLM call;
+    # the summary write opens its own
+    async with await psycopg.AsyncConnection.connect(database_url) as conn:
+        # Fetch memories
+        memories = await fetch_memories(conn, start, end)
+        print(f"Fetched {len(memories)} memories")
+
+        if not memories:
+            print("No memories from this period!")
+            summary = f"No memories from {period_label}."
+            await store_summary(conn, start, end, summary, 0)
+            return
+
+        # Fetch previous context for continuity
+        previous_periods = get_previous_periods(period, now)
+        prev_summaries = await fetch_summaries(
+            conn, [(prev_start, prev_end) for _, prev_start, prev_end in previous_periods]
+        )
+    for (label, _, _), prev_summary in zip(previous_periods, prev_summaries):
         if prev_summary:
             print(f"Found previous context: {label}")
 
@@ -267,7 +309,8 @@ async def async_main(period: str, date_str: str | None = None):
 
     # Store the summary
     print()
-    store_summary(database_url, start, end, summary, len(memories))
+    async with await psycopg.AsyncConnection.connect(database_url) as conn:
+        await store_summary(conn, start, end, summary, len(memories))
 
     print()
     print("=" * 60)
@@ -286,7 +329,8 @@ def main():
     )
     args = parser.parse_args()
 
-    asyncio.run(async_main(args.period, args.date))
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        runner.run(async_main(args.period, args.date))
 
 
 if __name__ == "__main__":
@@ -18,20 +18,26 @@ Usage:
     ./restic.py              # Run backup with retention
     ./restic.py --no-prune   # Backup only, skip retention pruning
     ./restic.py --dry-run    # Show what would be backed up
+    ./restic.py --force      # Back up even if nothing changed since last run
+    ./restic.py --force-prune # Apply retention now (normally at most once a day)
 """
 
 import argparse
+import fnmatch
+import json
 import os
 import shutil
 import subprocess
 import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
 
 import pendulum
 from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.resources import Resource, SERVICE_NAME
 from opentelemetry.trace import Status, StatusCode
 
 
@@ -41,8 +47,8 @@ RESTIC_REPO = os.getenv(
 )
 BACKUP_PATH = "/Pondside"
 
-# Find restic binary - check common locations
-RESTIC_BIN = shutil.which("restic") or "/usr/bin/restic"
+# Find restic binary - explicit override first, then PATH, then the usual spot
+RESTIC_BIN = os.environ.get("RESTIC_BIN") or shutil.which("restic") or "/usr/bin/restic"
 
 # Exclusions - reconstructible, generated, or ephemeral files
 EXCLUDES = [
@@ -63,6 +69,25 @@ EXCLUDES = [
     "Basement/Eavesdrop/data/flows.mitm",
 ]
 
+# EXCLUDES split by how they match, for the pre-backup change scan:
+# plain names (O(1) set lookup), name globs, and paths relative to BACKUP_PATH
+_EXCLUDE_NAMES = {p for p in EXCLUDES if "/" not in p and "*" not in p}
+_EXCLUDE_GLOBS = [p for p in EXCLUDES if "/" not in p and "*" in p]
+_EXCLUDE_PATHS = tuple(p for p in EXCLUDES if "/" in p)
+_EXCLUDE_PATH_SUFFIXES = tuple("/" + p for p in _EXCLUDE_PATHS)
+
+# Where run-to-run state (the backup watermark) lives
+STATE_DIR = Path(os.getenv("PULSE_STATE_DIR", str(Path.home() / ".local/state/pulse")))
+WATERMARK_FILE = STATE_DIR / "restic_watermark"
+EXCLUDE_FILE = STATE_DIR / "restic_excludes.txt"
+LAST_PRUNE_FILE = STATE_DIR / "restic_last_prune"
+
+# forget --prune re-reads every snapshot's index; once a day is plenty
+PRUNE_INTERVAL_SECONDS = 24 * 60 * 60
+
+# How much restic stderr to keep for error reporting
+STDERR_TAIL_LINES = 40
+
 # Retention policy
 RETENTION = {
     "keep-hourly": "24",
@@ -74,33 +99,184 @@ RETENTION = {
 
 # === OTel Setup ===
 def init_otel() -> trace.Tracer | None:
-    """Initialize OTel if endpoint is configured. Returns None if not."""
+    """Initialize OTel if endpoint is configured. Returns None if not.
+
+    Honors the standard OTEL_SDK_DISABLED and OTEL_SERVICE_NAME variables, so
+    the ten-minute ticks can skip exporter/processor setup entirely.
+    """
     endpoint = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
-    if not endpoint:
+    if not endpoint or os.environ.get("OTEL_SDK_DISABLED", "").lower() == "true":
         return None
 
-    resource = Resource.create({SERVICE_NAME: "restic-backup"})
+    # The SDK and exporter are only imported when tracing is actually on
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.exporter.otlp.proto.http import Compression
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import Resource, SERVICE_NAME
+
+    resource = Resource.create({SERVICE_NAME: os.environ.get("OTEL_SERVICE_NAME", "restic-backup")})
     provider = TracerProvider(resource=resource)
-    exporter = OTLPSpanExporter(endpoint=f"{endpoint}/v1/traces")
-    provider.add_span_processor(BatchSpanProcessor(exporter))
+    exporter = OTLPSpanExporter(endpoint=f"{endpoint}/v1/traces", compression=Compression.Gzip)
+    # A run emits a handful of spans, so export each as it ends: no batch
+    # worker thread to start, and nothing left to flush at exit
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
     trace.set_tracer_provider(provider)
     print(f"OTel enabled: {endpoint}")
     return trace.get_tracer("restic-backup")
 
 
-# === Restic Commands ===
-def run_restic(*args: str, timeout: int = 3600) -> subprocess.CompletedProcess:
-    """Run a restic command with the configured repository."""
-    cmd = [RESTIC_BIN, "-r", RESTIC_REPO, *args]
-    return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+# === Backup Stats ===
+@dataclass
+class BackupStats:
+    """The numbers from restic's final `backup --json` summary message."""
+    files_new: int
+    files_changed: int
+    files_processed: int
+    bytes_added: int
+    duration: float
+    snapshot_id: str | None
+
+    @classmethod
+    def from_summary(cls, msg: dict) -> "BackupStats":
+        return cls(
+            files_new=msg.get("files_new", 0),
+            files_changed=msg.get("files_changed", 0),
+            files_processed=msg.get("total_files_processed", 0),
+            bytes_added=msg.get("data_added", 0),
+            duration=msg.get("total_duration", 0.0),
+            snapshot_id=msg.get("snapshot_id"),  # absent on --dry-run
+        )
+
+
+# === Change Detection ===
+def read_watermark() -> float:
+    """Start time (epoch seconds) of the last successful backup, or 0 if unknown."""
+    try:
+        return float(WATERMARK_FILE.read_text().strip())
+    except (OSError, ValueError):
+        return 0.0
+
+
+def write_watermark(epoch: float):
+    """Record the start time of a successful backup."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    WATERMARK_FILE.write_text(f"{epoch}\n")
+
+
+def _excluded(name: str, rel_path: str) -> bool:
+    """Whether an entry is covered by EXCLUDES (so restic would skip it too)."""
+    if name in _EXCLUDE_NAMES:
+        return True
+    if any(fnmatch.fnmatchcase(name, g) for g in _EXCLUDE_GLOBS):
+        return True
+    return rel_path in _EXCLUDE_PATHS or rel_path.endswith(_EXCLUDE_PATH_SUFFIXES)
+
+
+def changed_since(watermark: float) -> bool:
+    """True if anything under BACKUP_PATH changed after the watermark.
+
+    Walks the tree with os.scandir, skipping excluded entries, and stops at the
+    first hit. Directories count too (mtime/ctime move on create, delete, and
+    rename), as do ctime-only changes like chmod or a file moved in. Anything
+    unreadable counts as changed, so restic gets to make the call.
+    """
+    try:
+        st = os.stat(BACKUP_PATH)
+    except OSError:
+        return True
+    if max(st.st_mtime, st.st_ctime) > watermark:
+        return True
+
+    stack = [BACKUP_PATH]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            return True
+        with it:
+            for entry in it:
+                if _excluded(entry.name, os.path.relpath(entry.path, BACKUP_PATH)):
+                    continue
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    return True
+                if max(st.st_mtime, st.st_ctime) > watermark:
+                    return True
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+    return False
+
+
+def write_exclude_file() -> Path:
+    """Materialize EXCLUDES for restic's --exclude-file, rewriting only if stale."""
+    content = "\n".join(EXCLUDES) + "\n"
+    try:
+        if EXCLUDE_FILE.read_text() == content:
+            return EXCLUDE_FILE
+    except OSError:
+        pass
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    EXCLUDE_FILE.write_text(content)
+    return EXCLUDE_FILE
 
 
-def backup(dry_run: bool = False, span: trace.Span | None = None) -> bool:
-    """Run the backup. Returns True on success."""
-    backup_args = ["backup", BACKUP_PATH]
+# === Restic Commands ===
+def run_restic(*args: str, timeout: int = 3600,
+               on_line: Callable[[str], None] | None = None) -> subprocess.CompletedProcess:
+    """Run a restic command with the configured repository.
+
+    Output is streamed rather than buffered: each stdout line is handed to
+    on_line as it arrives, and only the last STDERR_TAIL_LINES of stderr are
+    kept. The returned CompletedProcess carries that stderr tail (stdout is
+    not retained). Raises subprocess.TimeoutExpired if restic overruns.
+    """
+    cmd = [RESTIC_BIN, "-r", RESTIC_REPO, *args]
+    stderr_tail: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+    timed_out = threading.Event()
+
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          text=True, bufsize=1) as proc:
+        # Drain stderr alongside stdout so neither pipe can fill and stall restic
+        drain = threading.Thread(target=stderr_tail.extend, args=(proc.stderr,), daemon=True)
+        drain.start()
+
+        def kill():
+            timed_out.set()
+            proc.kill()
+
+        watchdog = threading.Timer(timeout, kill)
+        watchdog.start()
+        try:
+            for line in proc.stdout:
+                if on_line:
+                    on_line(line.rstrip("\n"))
+            returncode = proc.wait()
+        finally:
+            watchdog.cancel()
+        drain.join()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+
+    return subprocess.CompletedProcess(cmd, returncode, "", "".join(stderr_tail))
+
+
+def backup(dry_run: bool = False, force: bool = False, span: trace.Span | None = None) -> bool:
+    """Run the backup. Returns True on success.
+
+    Skips launching restic entirely when nothing has changed since the last
+    successful backup, unless force is set.
+    """
+    started = time.time()
+    if not force and not dry_run and not changed_since(read_watermark()):
+        print(f"Nothing changed under {BACKUP_PATH} since last backup, skipping")
+        if span:
+            span.set_attribute("backup.status", "skipped")
+        return True
 
-    for pattern in EXCLUDES:
-        backup_args.extend(["--exclude", pattern])
+    backup_args = ["backup", BACKUP_PATH, "--json", "--exclude-file", str(write_exclude_file())]
 
     if dry_run:
         backup_args.append("--dry-run")
@@ -109,7 +285,22 @@ def backup(dry_run: bool = False, span: trace.Span | None = None) -> bool:
     if dry_run:
         print("(dry run - no changes will be made)")
 
-    result = run_restic(*backup_args)
+    # With --json restic emits one status object per line and a final summary;
+    # only the summary is kept, everything else is dropped as it streams past
+    stats: BackupStats | None = None
+
+    def collect_summary(line: str):
+        nonlocal stats
+        if '"summary"' not in line:
+            return
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            return
+        if msg.get("message_type") == "summary":
+            stats = BackupStats.from_summary(msg)
+
+    result = run_restic(*backup_args, on_line=collect_summary)
 
     if result.returncode != 0:
         print(f"Backup failed!")
@@ -119,22 +310,47 @@ def backup(dry_run: bool = False, span: trace.Span | None = None) -> bool:
             span.set_attribute("backup.error", result.stderr[:500] if result.stderr else "unknown")
         return False
 
-    # Parse output for stats
     print("Backup complete")
-    if result.stdout:
-        # Show the summary lines
-        for line in result.stdout.split('\n'):
-            if any(x in line.lower() for x in ['added', 'processed', 'snapshot']):
-                print(f"  {line}")
+    if stats:
+        print(f"  Files: {stats.files_new} new, {stats.files_changed} changed, "
+              f"{stats.files_processed} processed")
+        print(f"  Added: {stats.bytes_added} bytes in {stats.duration:.1f}s")
+        if stats.snapshot_id:
+            print(f"  Snapshot: {stats.snapshot_id}")
+
+    if not dry_run:
+        write_watermark(started)
 
     if span:
         span.set_attribute("backup.status", "success")
+        if stats:
+            span.set_attribute("backup.files_new", stats.files_new)
+            span.set_attribute("backup.files_changed", stats.files_changed)
+            span.set_attribute("backup.files_processed", stats.files_processed)
+            span.set_attribute("backup.bytes_added", stats.bytes_added)
+            span.set_attribute("backup.duration_seconds", stats.duration)
+            if stats.snapshot_id:
+                span.set_attribute("backup.snapshot_id", stats.snapshot_id)
 
     return True
 
 
-def prune(span: trace.Span | None = None) -> bool:
-    """Apply retention policy. Returns True on success."""
+def prune(force: bool = False, span: trace.Span | None = None) -> bool:
+    """Apply retention policy. Returns True on success.
+
+    Runs at most once per PRUNE_INTERVAL_SECONDS unless force is set.
+    """
+    if not force:
+        try:
+            since_last = time.time() - LAST_PRUNE_FILE.stat().st_mtime
+        except OSError:
+            since_last = None
+        if since_last is not None and since_last < PRUNE_INTERVAL_SECONDS:
+            print(f"Prune skipped (last ran {since_last / 3600:.1f}h ago)")
+            if span:
+                span.set_attribute("prune.status", "skipped")
+            return True
+
     print("Applying retention policy...")
 
     prune_args = ["forget"]
@@ -152,6 +368,8 @@ def prune(span: trace.Span | None = None) -> bool:
         return False
 
     print("Retention policy applied")
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    LAST_PRUNE_FILE.touch()
     if span:
         span.set_attribute("prune.status", "success")
 
@@ -168,6 +386,8 @@ Examples:
     ./restic.py              # Full backup with retention
     ./restic.py --no-prune   # Backup only, skip pruning
     ./restic.py --dry-run    # Show what would happen
+    ./restic.py --force      # Back up even if nothing changed
+    ./restic.py --force-prune # Apply retention now, not just once a day
         """
     )
     parser.add_argument(
@@ -180,19 +400,43 @@ Examples:
         action="store_true",
         help="Show what would be backed up without making changes"
     )
+    parser.add_argument(
+        "--force-prune",
+        action="store_true",
+        help="Apply retention now, even if it ran within the last day"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run restic even if nothing changed since the last backup"
+    )
     args = parser.parse_args()
 
+    tracer = init_otel()
+    if not run(dry_run=args.dry_run, no_prune=args.no_prune, force=args.force,
+               force_prune=args.force_prune, tracer=tracer):
+        sys.exit(1)
+
+
+def run(*, dry_run: bool = False, no_prune: bool = False, force: bool = False,
+        force_prune: bool = False, tracer: trace.Tracer | None = None) -> bool:
+    """One backup pass (plus retention, when due). Returns True on success.
+
+    main() calls this for command-line runs. Pulse loads this file and calls it
+    in-process with its own tracer, so a ten-minute tick doesn't pay for uv and
+    a fresh interpreter.
+    """
     # Check restic is available
     if not os.path.exists(RESTIC_BIN):
         print(f"Error: restic not found at {RESTIC_BIN}")
-        sys.exit(1)
+        return False
 
     # Check required env vars
     required_vars = ["AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "RESTIC_PASSWORD"]
     missing = [v for v in required_vars if not os.environ.get(v)]
     if missing:
         print(f"Error: Missing required environment variables: {', '.join(missing)}")
-        sys.exit(1)
+        return False
 
     now = pendulum.now("America/Los_Angeles")
     print("=" * 60)
@@ -203,9 +447,6 @@ Examples:
     print(f"Restic binary: {RESTIC_BIN}")
     print()
 
-    # Init OTel
-    tracer = init_otel()
-
     # Context manager for span
     from contextlib import nullcontext
     span_ctx = tracer.start_as_current_span("restic.backup") if tracer else nullcontext()
@@ -214,19 +455,19 @@ Examples:
         if span:
             span.set_attribute("backup.path", BACKUP_PATH)
             span.set_attribute("backup.repository", RESTIC_REPO)
-            span.set_attribute("backup.dry_run", args.dry_run)
+            span.set_attribute("backup.dry_run", dry_run)
 
         # Run backup
-        success = backup(dry_run=args.dry_run, span=span)
+        success = backup(dry_run=dry_run, force=force, span=span)
 
         if not success:
             if span:
                 span.set_status(Status(StatusCode.ERROR, "Backup failed"))
-            sys.exit(1)
+            return False
 
         # Run prune unless skipped or dry run
-        if not args.no_prune and not args.dry_run:
-            prune_success = prune(span=span)
+        if not no_prune and not dry_run:
+            prune_success = prune(force=force_prune, span=span)
             if not prune_success:
                 # Prune failure is warning, not fatal
                 print("Warning: Prune failed, but backup succeeded")
@@ -234,12 +475,9 @@ Examples:
         if span:
             span.set_status(Status(StatusCode.OK))
 
-    # Flush traces
-    if tracer:
-        trace.get_tracer_provider().force_flush(timeout_millis=5000)
-
     print()
     print("Done!")
+    return True
 
 
 if __name__ == "__main__":
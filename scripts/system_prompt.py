@@ -2,9 +2,11 @@
 # /// script
 # requires-python = ">=3.11"
 # dependencies = [
+#     "httpx>=0.27",
 #     "pendulum>=3.0",
 #     "redis>=5.0",
 #     "icalendar>=5.0",
+#     "orjson>=3.9",
 #     "opentelemetry-api>=1.20",
 #     "opentelemetry-sdk>=1.20",
 #     "opentelemetry-exporter-otlp-proto-http>=1.20",
@@ -27,28 +29,43 @@ Usage:
 """
 
 import argparse
+import io
 import json
 import os
-import urllib.request
-import urllib.parse
-from datetime import datetime
-
+import re
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import date, datetime, time, timezone
+from functools import partial
+from typing import TYPE_CHECKING
+from zoneinfo import ZoneInfo
+
+import httpx
+import orjson
 import pendulum
-import redis
-from icalendar import Calendar
 from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.resources import Resource, SERVICE_NAME
+
+# icalendar and redis are imported where they're used, so runs that never
+# reach those paths (dry runs, failed fetches) don't pay to load them
+if TYPE_CHECKING:
+    import redis
+    from icalendar import Calendar
 
 
 # === Config ===
 REDIS_URL = os.getenv("REDIS_URL", "redis://alpha-pi:6379")
 TTL_SECONDS = 65 * 60  # 65 minutes - stale data disappears rather than lies
 
+# SETEX every KEYS[i] to ARGV[i + 1] with TTL ARGV[1], server-side in one command
+SETEX_ALL = """
+for i, key in ipairs(KEYS) do
+    redis.call('SETEX', key, ARGV[1], ARGV[i + 1])
+end
+return #KEYS
+"""
+
 # Timezone (PSO-8601: always local time, America/Los_Angeles)
 PACIFIC = "America/Los_Angeles"
+PACIFIC_TZ = ZoneInfo(PACIFIC)
 
 # Location for weather
 LOCATION = {
@@ -69,9 +86,28 @@ CALENDARS = {
     },
 }
 
+# One keep-alive client for every fetch (thread-safe, shared by the gatherers),
+# so repeat calls to the same host reuse the TLS connection
+HTTP = httpx.Client(
+    timeout=10,
+    follow_redirects=True,  # urllib did; ICS feeds can redirect
+    limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+)
+
+# Conditional-GET cache for the ICS feeds: validators + parsed events per calendar
+ICS_CACHE_TTL = 24 * 60 * 60
+
+# ICS pre-filtering: whole VEVENT/VTIMEZONE blocks, and the date part of DTSTART
+VEVENT_RE = re.compile(rb"BEGIN:VEVENT\r?\n.*?END:VEVENT", re.DOTALL)
+VTIMEZONE_RE = re.compile(rb"BEGIN:VTIMEZONE\r?\n.*?END:VTIMEZONE", re.DOTALL)
+DTSTART_RE = re.compile(rb"^DTSTART[^:\r\n]*:(\d{8})", re.MULTILINE)
+
 # Todoist projects to include
 TODOIST_PROJECTS = ["Pondside", "Alpha", "Jeffery"]
 
+# Todoist API priority (4 = most urgent) → label shown in the prompt
+PRIORITY_LABELS = {4: "[p1] ", 3: "[p2] ", 2: "[p3] "}
+
 # WMO Weather codes to emoji and description
 WMO_CODES = {
     0: ("☀️", "Clear"), 1: ("🌤️", "Mostly clear"), 2: ("⛅", "Partly cloudy"),
@@ -91,28 +127,55 @@ def init_otel() -> trace.Tracer | None:
     if not endpoint:
         return None
 
+    # The SDK and exporter are only imported when tracing is actually on
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.exporter.otlp.proto.http import Compression
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import Resource, SERVICE_NAME
+
     resource = Resource.create({SERVICE_NAME: "system-prompt"})
     provider = TracerProvider(resource=resource)
-    exporter = OTLPSpanExporter(endpoint=f"{endpoint}/v1/traces")
-    provider.add_span_processor(BatchSpanProcessor(exporter))
+    exporter = OTLPSpanExporter(endpoint=f"{endpoint}/v1/traces", compression=Compression.Gzip)
+    # Sized for a run that lasts seconds: small queue, short delay, and an export
+    # timeout that can't outlast the final flush
+    provider.add_span_processor(BatchSpanProcessor(
+        exporter,
+        max_queue_size=512,
+        schedule_delay_millis=500,
+        max_export_batch_size=128,
+        export_timeout_millis=3000,
+    ))
     trace.set_tracer_provider(provider)
     print(f"OTel enabled: {endpoint}")
     return trace.get_tracer("system-prompt")
 
 
+def shutdown_otel() -> None:
+    """Export whatever spans are still queued, then stop the exporter.
+
+    One drain, bounded by the exporter's 3-second timeout; the provider's own
+    atexit shutdown then finds nothing left to do.
+    """
+    trace.get_tracer_provider().shutdown()
+
+
 # === PSO-8601 Formatting ===
-def pso8601(dt: pendulum.DateTime) -> str:
+def pso8601(dt: datetime) -> str:
     """Format datetime in PSO-8601: human-readable local time.
 
+    Takes a pendulum or stdlib datetime; strftime is C, pendulum's format()
+    re-tokenizes its pattern on every call.
+
     Example: "Wed Jan 15 2026, 9:00 AM"
     """
-    return dt.format("ddd MMM D YYYY, h:mm A")
+    return dt.strftime("%a %b %-d %Y, %-I:%M %p")
 
 
 # === Weather Gathering ===
 def gather_weather() -> str | None:
     """Fetch and format weather from Open-Meteo."""
-    url = "https://api.open-meteo.com/v1/forecast?" + urllib.parse.urlencode({
+    params = {
         "latitude": LOCATION["latitude"],
         "longitude": LOCATION["longitude"],
         "current": "temperature_2m,relative_humidity_2m,apparent_temperature,weather_code,wind_speed_10m",
@@ -121,11 +184,12 @@ def gather_weather() -> str | None:
         "wind_speed_unit": "mph",
         "timezone": LOCATION["timezone"],
         "forecast_days": 1,
-    })
+    }
 
     try:
-        with urllib.request.urlopen(url, timeout=10) as response:
-            data = json.loads(response.read().decode())
+        response = HTTP.get("https://api.open-meteo.com/v1/forecast", params=params)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
     except Exception as e:
         print(f"Weather fetch failed: {e}")
         return None
@@ -164,56 +228,144 @@ def gather_weather() -> str | None:
 
 
 # === Calendar Gathering ===
-def fetch_calendar(url: str) -> Calendar | None:
-    """Fetch and parse an ICS calendar."""
+def prefilter_ics(body: bytes, start_date: pendulum.Date, end_date: pendulum.Date) -> bytes:
+    """Cut an ICS feed down to the VEVENTs that can land in the date range.
+
+    A feed holds years of events; only a handful fall in the window. Each VEVENT's
+    raw DTSTART date is checked with a day of slack on either side (UTC vs Pacific
+    can shift the date), so get_events still does the exact filtering. Events
+    whose DTSTART can't be read are kept. VTIMEZONE blocks are kept for TZIDs.
+    """
+    lo = start_date.subtract(days=1).strftime("%Y%m%d").encode()
+    hi = end_date.add(days=1).strftime("%Y%m%d").encode()
+
+    kept = [m.group() for m in VTIMEZONE_RE.finditer(body)]
+    for m in VEVENT_RE.finditer(body):
+        dtstart = DTSTART_RE.search(m.group())
+        if dtstart is None or lo <= dtstart.group(1) <= hi:
+            kept.append(m.group())
+
+    return b"BEGIN:VCALENDAR\r\n" + b"\r\n".join(kept) + b"\r\nEND:VCALENDAR\r\n"
+
+
+def encode_event(event: dict) -> dict:
+    """Event dict → JSON-safe dict for the ICS cache."""
+    return {
+        "dt": event["dt"].isoformat(),
+        "summary": event["summary"],
+        "location": event["location"],
+        "all_day": event["all_day"],
+    }
+
+
+def decode_event(event: dict) -> dict:
+    """Inverse of encode_event."""
+    if event["all_day"]:
+        dt = date.fromisoformat(event["dt"])
+        return {**event, "dt": dt, "date": dt}
+    dt = datetime.fromisoformat(event["dt"]).astimezone(PACIFIC_TZ)
+    return {**event, "dt": dt, "date": dt.date()}
+
+
+def fetch_calendar(name: str, url: str, start_date: pendulum.Date, end_date: pendulum.Date,
+                   cache: "redis.Redis | None" = None) -> list[dict] | None:
+    """Fetch an ICS calendar and return its events within the date range.
+
+    With a Redis client, the last response's ETag/Last-Modified and parsed
+    events are kept under cache:ics:{name}. If they cover the date range, the
+    fetch is conditional, and a 304 reuses the cached events without parsing.
+    """
+    from icalendar import Calendar
+
+    key = f"cache:ics:{name}"
+    cached = None
+    if cache is not None:
+        try:
+            raw = cache.get(key)
+            cached = json.loads(raw) if raw else None
+        except Exception as e:
+            print(f"Calendar cache read failed: {e}")
+
+    headers = {}
+    if cached and cached["start"] <= start_date.isoformat() and cached["end"] >= end_date.isoformat():
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
     try:
-        with urllib.request.urlopen(url, timeout=10) as response:
-            return Calendar.from_ical(response.read())
+        response = HTTP.get(url, headers=headers)
+        if response.status_code == 304 and headers:
+            events = [decode_event(e) for e in cached["events"]]
+            return [e for e in events if start_date <= e["date"] <= end_date]
+        response.raise_for_status()
+        cal = Calendar.from_ical(prefilter_ics(response.content, start_date, end_date))
     except Exception as e:
         print(f"Calendar fetch failed: {e}")
         return None
 
+    events = get_events(cal, start_date, end_date)
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if cache is not None and (etag or last_modified):
+        try:
+            cache.setex(key, ICS_CACHE_TTL, json.dumps({
+                "etag": etag,
+                "last_modified": last_modified,
+                "start": start_date.isoformat(),
+                "end": end_date.isoformat(),
+                "events": [encode_event(e) for e in events],
+            }))
+        except Exception as e:
+            print(f"Calendar cache write failed: {e}")
+
+    return events
+
 
-def get_events(cal: Calendar, start_date: pendulum.Date, end_date: pendulum.Date) -> list[dict]:
-    """Extract events from a calendar within date range."""
+def event_sort_key(event: dict) -> tuple:
+    """Sort by date, then all-day before timed, then by time."""
+    if event["all_day"]:
+        return (event["date"], 0, time.min)
+    return (event["date"], 1, event["dt"].time())
+
+
+def get_events(cal: "Calendar", start_date: pendulum.Date, end_date: pendulum.Date) -> list[dict]:
+    """Extract events from a calendar within date range.
+
+    Each event's Pacific date is worked out once and stored as "date", for the
+    range check, the sort, and the grouping in format_calendar_events.
+    """
     events = []
 
-    for component in cal.walk():
-        if component.name == "VEVENT":
-            dtstart = component.get("dtstart")
-            if not dtstart:
-                continue
-
-            dt = dtstart.dt
-            is_all_day = not hasattr(dt, "hour")
-
-            if is_all_day:
-                event_date = pendulum.date(dt.year, dt.month, dt.day)
-                if start_date <= event_date <= end_date:
-                    events.append({
-                        "dt": event_date,
-                        "summary": str(component.get("summary", "Untitled")),
-                        "location": str(component.get("location")) if component.get("location") else None,
-                        "all_day": True,
-                    })
-            else:
-                event_dt = pendulum.instance(dt).in_tz(PACIFIC)
-                event_date = event_dt.date()
-                if start_date <= event_date <= end_date:
-                    events.append({
-                        "dt": event_dt,
-                        "summary": str(component.get("summary", "Untitled")),
-                        "location": str(component.get("location")) if component.get("location") else None,
-                        "all_day": False,
-                    })
+    for component in cal.walk("VEVENT"):
+        dtstart = component.get("dtstart")
+        if not dtstart:
+            continue
+
+        dt = dtstart.dt
+        is_all_day = not hasattr(dt, "hour")
 
-    # Sort by date, then all-day before timed, then by time
-    def sort_key(e):
-        if e["all_day"]:
-            return (e["dt"], 0, pendulum.time(0, 0))
-        return (e["dt"].date(), 1, e["dt"].time())
+        if is_all_day:
+            event_date = dt
+        else:
+            if dt.tzinfo is None:  # floating time; read as UTC, as pendulum.instance did
+                dt = dt.replace(tzinfo=timezone.utc)
+            dt = dt.astimezone(PACIFIC_TZ)
+            event_date = dt.date()
 
-    return sorted(events, key=sort_key)
+        if start_date <= event_date <= end_date:
+            location = component.get("location")
+            events.append({
+                "dt": dt,
+                "date": event_date,
+                "summary": str(component.get("summary", "Untitled")),
+                "location": str(location) if location else None,
+                "all_day": is_all_day,
+            })
+
+    events.sort(key=event_sort_key)
+    return events
 
 
 def format_calendar_events(events: list[dict], today: pendulum.Date) -> str:
@@ -221,107 +373,118 @@ def format_calendar_events(events: list[dict], today: pendulum.Date) -> str:
     if not events:
         return "No events"
 
-    lines = []
+    tomorrow = today.add(days=1)
+
+    # Written straight into one buffer: no per-line strings to join afterwards
+    buf = io.StringIO()
     current_date = None
 
     for event in events:
-        event_date = event["dt"] if event["all_day"] else event["dt"].date()
+        event_date = event["date"]
 
         if event_date != current_date:
             current_date = event_date
             if event_date == today:
                 date_label = "Today"
-            elif event_date == today.add(days=1):
+            elif event_date == tomorrow:
                 date_label = "Tomorrow"
             else:
-                date_label = event_date.format("ddd MMM D")
-            lines.append(f"**{date_label}**")
+                date_label = event_date.strftime("%a %b %-d")
+            buf.write(f"**{date_label}**\n")
 
         if event["all_day"]:
             time_str = "(all day)"
         else:
-            time_str = event["dt"].format("h:mm A")
+            time_str = event["dt"].strftime("%-I:%M %p")
 
-        line = f"• {time_str}: {event['summary']}"
+        buf.write(f"• {time_str}: {event['summary']}")
         if event["location"]:
-            line += f" @ {event['location'][:40]}"
-        lines.append(line)
+            buf.write(f" @ {event['location'][:40]}")
+        buf.write("\n")
 
-    return "\n".join(lines)
+    return buf.getvalue()[:-1]
 
 
-def gather_calendar(name: str) -> str | None:
+def gather_calendar(name: str, cache: "redis.Redis | None" = None) -> str | None:
     """Gather calendar events for a person."""
     config = CALENDARS.get(name)
     if not config:
         return None
 
-    cal = fetch_calendar(config["url"])
-    if not cal:
-        return None
-
     now = pendulum.now(PACIFIC)
     today = now.date()
     end_date = today.add(days=config["days_ahead"])
 
-    events = get_events(cal, today, end_date)
+    events = fetch_calendar(name, config["url"], today, end_date, cache)
+    if events is None:
+        return None
+
     return format_calendar_events(events, today)
 
 
 # === Todoist Gathering ===
-def gather_todos(project_name: str) -> str | None:
-    """Gather Todoist tasks for a single project."""
-    token = os.environ.get("TODOIST_TOKEN")
-    if not token:
-        print("TODOIST_TOKEN not set, skipping todos")
-        return None
-
-    headers = {"Authorization": f"Bearer {token}"}
+def fetch_todoist(token: str) -> tuple[dict[str, str], dict[str, list[dict]]] | None:
+    """Fetch all Todoist projects and active tasks in one Sync API call.
 
-    # Get all projects to find the ID
+    Returns ({lowercase project name: id}, {project id: [tasks]}). main() runs
+    it once, alongside the other gatherers, and every gather_todos shares it.
+    """
     try:
-        req = urllib.request.Request("https://api.todoist.com/rest/v2/projects", headers=headers)
-        with urllib.request.urlopen(req, timeout=10) as response:
-            projects = json.loads(response.read().decode())
+        response = HTTP.post(
+            "https://api.todoist.com/api/v1/sync",
+            headers={"Authorization": f"Bearer {token}"},
+            data={"sync_token": "*", "resource_types": '["projects","items"]'},
+        )
+        response.raise_for_status()
+        data = orjson.loads(response.content)
     except Exception as e:
-        print(f"Todoist projects fetch failed: {e}")
+        print(f"Todoist sync failed: {e}")
         return None
 
-    project_id = None
-    for p in projects:
-        if project_name.lower() in p["name"].lower():
-            project_id = p["id"]
-            break
+    projects = {}
+    for p in data.get("projects", []):
+        if not p.get("is_deleted"):
+            projects.setdefault(p["name"].lower(), p["id"])
+
+    tasks_by_project = {}
+    for item in data.get("items", []):
+        if not item.get("checked") and not item.get("is_deleted"):
+            tasks_by_project.setdefault(item["project_id"], []).append(item)
+
+    return projects, tasks_by_project
+
+
+def gather_todos(project_name: str, sync: Future | None) -> str | None:
+    """Gather Todoist tasks for a single project, from the shared sync."""
+    if sync is None:
+        print("TODOIST_TOKEN not set, skipping todos")
+        return None
+
+    todoist = sync.result()
+    if todoist is None:
+        return None
+    projects, tasks_by_project = todoist
+
+    match = project_name.lower()
+    project_id = next((pid for name, pid in projects.items() if match in name), None)
 
     if not project_id:
         return "No tasks"
 
-    # Get tasks for this project
-    try:
-        url = f"https://api.todoist.com/rest/v2/tasks?project_id={project_id}"
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=10) as response:
-            tasks = json.loads(response.read().decode())
-    except Exception as e:
-        print(f"Todoist tasks fetch failed: {e}")
-        return None
+    tasks = tasks_by_project.get(project_id, [])
 
     if not tasks:
         return "No tasks"
 
-    # Sort by priority (high first)
-    tasks.sort(key=lambda t: -t.get("priority", 1))
+    # Sort by priority (high first), then Todoist's own order
+    tasks = sorted(tasks, key=lambda t: (-t.get("priority", 1), t.get("child_order", 0)))
 
     # Format
-    lines = []
+    buf = io.StringIO()
     for task in tasks:
-        priority = {4: "[p1]", 3: "[p2]", 2: "[p3]"}.get(task.get("priority", 1), "")
-        if priority:
-            lines.append(f"• {priority} {task['content']}")
-        else:
-            lines.append(f"• {task['content']}")
+        buf.write(f"• {PRIORITY_LABELS.get(task.get('priority', 1), '')}{task['content']}\n")
 
-    return "\n".join(lines)
+    return buf.getvalue()[:-1]
 
 
 # === Main ===
@@ -338,31 +501,38 @@ def main():
     print("=" * 60)
     print()
 
-    # Collect all parts
-    parts = {}
-
-    # Present: weather (includes sun position)
-    print("Gathering weather...")
-    weather = gather_weather()
-    if weather:
-        parts["systemprompt:present:weather"] = weather
-        print(f"  ✓ Weather ({len(weather)} chars)")
+    # Redis holds the ICS conditional-GET cache; a dry run neither reads nor writes it
+    r = None
+    if not args.dry_run:
+        import redis
+        r = redis.from_url(REDIS_URL)
 
-    # Future: calendars (separate keys)
+    # Every gatherer is independent network I/O, keyed by its Redis key:
+    # present (weather, includes sun position), future (calendars, todos per project)
+    gatherers = {"systemprompt:present:weather": ("Weather", gather_weather)}
     for name in CALENDARS:
-        print(f"Gathering {name}'s calendar...")
-        cal = gather_calendar(name)
-        if cal:
-            parts[f"systemprompt:future:{name}"] = cal
-            print(f"  ✓ {name.title()}'s calendar ({len(cal)} chars)")
-
-    # Future: todos (separate keys per project)
-    for project in TODOIST_PROJECTS:
-        print(f"Gathering {project} todos...")
-        todos = gather_todos(project)
-        if todos:
-            parts[f"systemprompt:future:todos:{project.lower()}"] = todos
-            print(f"  ✓ {project} todos ({len(todos)} chars)")
+        gatherers[f"systemprompt:future:{name}"] = (f"{name.title()}'s calendar", partial(gather_calendar, name, r))
+
+    # Run them concurrently so the total wait is the slowest fetch, not the sum
+    print(f"Gathering {len(gatherers) + len(TODOIST_PROJECTS)} parts...")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        # The Todoist sync goes first, overlapping the rest; the todo gatherers
+        # wait on it and share the one response
+        token = os.environ.get("TODOIST_TOKEN")
+        sync = executor.submit(fetch_todoist, token) if token else None
+        for project in TODOIST_PROJECTS:
+            gatherers[f"systemprompt:future:todos:{project.lower()}"] = (f"{project} todos", partial(gather_todos, project, sync))
+
+        futures = {executor.submit(fn): key for key, (_, fn) in gatherers.items()}
+        results = {futures[future]: future.result() for future in as_completed(futures)}
+
+    # Collect all parts (in the original order)
+    parts = {}
+    for key, (label, _) in gatherers.items():
+        value = results[key]
+        if value:
+            parts[key] = value
+            print(f"  ✓ {label} ({len(value)} chars)")
 
     # Timestamp
     parts["systemprompt:updated"] = pso8601(now)
@@ -376,15 +546,10 @@ def main():
             print(value)  # Show full content
         return
 
-    # Write to Redis atomically
+    # Write to Redis atomically: one EVAL sets every key with the shared TTL
     print("Writing to Redis...")
-    r = redis.from_url(REDIS_URL)
-    pipe = r.pipeline()
-
-    for key, value in parts.items():
-        pipe.setex(key, TTL_SECONDS, value)
-
-    pipe.execute()
+    keys = list(parts)
+    r.eval(SETEX_ALL, len(keys), *keys, TTL_SECONDS, *(parts[k] for k in keys))
     print(f"  ✓ {len(parts)} keys written with {TTL_SECONDS // 60}-minute TTL")
 
     print()
@@ -392,8 +557,7 @@ def main():
 
     # Flush OTel
     if tracer:
-        trace.get_tracer_provider().force_flush(timeout_millis=5000)
-        print("Traces flushed")
+        shutdown_otel()
 
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@
 #     "psycopg[binary]>=3.1",
 #     "pendulum>=3.0",
 #     "redis>=5.0",
+#     "uvloop>=0.19",
 #     "opentelemetry-api>=1.20",
 #     "opentelemetry-sdk>=1.20",
 #     "opentelemetry-exporter-otlp-proto-http>=1.20",
@@ -30,17 +31,15 @@ Usage:
 
 import argparse
 import asyncio
+import io
 import os
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
 import pendulum
 import psycopg
-import redis
+import uvloop
 from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.resources import Resource, SERVICE_NAME
 from opentelemetry.trace import Status, StatusCode
 
 # === Config ===
@@ -50,6 +49,7 @@ TTL_SECONDS = 65 * 60  # 65 minutes - matches other system prompt parts
 
 SYSTEM_PROMPT_PATH = Path("/Pondside/Alpha-Home/self/system-prompt/system-prompt.md")
 PACIFIC = "America/Los_Angeles"
+PACIFIC_TZ = ZoneInfo(PACIFIC)
 
 
 # === OTel Setup ===
@@ -59,10 +59,19 @@ def init_otel() -> trace.Tracer | None:
     if not endpoint:
         return None
 
+    # The SDK and exporter are only imported when tracing is actually on
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.exporter.otlp.proto.http import Compression
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import Resource, SERVICE_NAME
+
     resource = Resource.create({SERVICE_NAME: "today"})
     provider = TracerProvider(resource=resource)
-    exporter = OTLPSpanExporter(endpoint=f"{endpoint}/v1/traces")
-    provider.add_span_processor(BatchSpanProcessor(exporter))
+    exporter = OTLPSpanExporter(endpoint=f"{endpoint}/v1/traces", compression=Compression.Gzip)
+    # A run emits a handful of spans, so export each as it ends: no batch
+    # worker thread to start, and nothing left to flush at exit
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
     trace.set_tracer_provider(provider)
     print(f"OTel enabled: {endpoint}")
     return trace.get_tracer("today")
@@ -70,34 +79,48 @@ def init_otel() -> trace.Tracer | None:
 
 # === Memory Fetching ===
 def fetch_memories_since(database_url: str, since: pendulum.DateTime) -> list[dict]:
-    """Fetch all memories since the given time, chronologically."""
+    """Fetch all memories since the given time, chronologically.
+
+    Filters and sorts on cortex.memory_created_at() so Postgres can range-scan
+    memories_created_at_idx (sql/memories_created_at.sql), the same index
+    capsule uses, rather than casting and sorting every row. Ties break on id,
+    which the index is also keyed on.
+
+    Rows stream from a server-side cursor in batches, and created_at comes
+    back as a timestamptz, so there's no per-row string parsing.
+    """
     with psycopg.connect(database_url) as conn:
-        with conn.cursor() as cur:
+        with conn.cursor(name="memories_stream") as cur:
+            cur.itersize = 500
             cur.execute("""
-                SELECT id, content, metadata->>'created_at' as created_at
+                SELECT id, content, cortex.memory_created_at(metadata) AS created_at
                 FROM cortex.memories
                 WHERE NOT forgotten
-                  AND (metadata->>'created_at')::timestamptz >= %s
-                ORDER BY (metadata->>'created_at')::timestamptz ASC
-            """, (since.to_iso8601_string(),))
-
-            memories = []
-            for row in cur.fetchall():
-                dt = pendulum.parse(row[2]).in_timezone(PACIFIC)
-                memories.append({
+                  AND cortex.memory_created_at(metadata) >= %s
+                ORDER BY cortex.memory_created_at(metadata) ASC, id ASC
+            """, (since,))
+
+            return [
+                {
                     "id": row[0],
                     "content": row[1],
-                    "time": dt.format("h:mm A"),
-                })
-            return memories
+                    "time": row[2].astimezone(PACIFIC_TZ).strftime("%-I:%M %p"),
+                }
+                for row in cur
+            ]
 
 
 # === The Note From Me To Me ===
 def build_prompt(memories: list[dict], now: pendulum.DateTime) -> str:
     """Build the prompt—a note from me to me about today so far."""
-    memories_text = "\n\n---\n\n".join(
-        f"[{m['time']}]\n{m['content']}" for m in memories
-    )
+    buf = io.StringIO()
+    sep = ""
+    for m in memories:
+        buf.write(sep)
+        buf.write(f"[{m['time']}]\n")
+        buf.write(m["content"])
+        sep = "\n\n---\n\n"
+    memories_text = buf.getvalue()
 
     day_name = now.format("dddd, MMMM D")
     current_time = now.format("h:mm A")
@@ -128,9 +151,10 @@ No headers, no bullet points. Just the handoff.
 # === Load System Prompt ===
 def load_system_prompt() -> str | None:
     """Load Alpha's system prompt (her soul)."""
-    if SYSTEM_PROMPT_PATH.exists():
+    try:
         return SYSTEM_PROMPT_PATH.read_text()
-    return None
+    except FileNotFoundError:
+        return None
 
 
 # === Agent Execution ===
@@ -155,8 +179,7 @@ async def run_today(prompt: str, system_prompt: str | None,
             allowed_tools=[],  # No tools needed for summarization
             permission_mode="bypassPermissions",
             system_prompt=system_prompt,
-            cwd="/Pondside",
-            env=dict(os.environ),
+            cwd="/Pondside",  # env: the SDK's CLI subprocess inherits os.environ already
         )
 
         output_parts = []
@@ -232,9 +255,8 @@ async def async_main(dry_run: bool = False):
         # Run today-me
         summary = await run_today(prompt, system_prompt, tracer)
 
-    # Add timestamp header
-    header = f"**Today so far** ({now.format('h:mm A')}):\n\n"
-    full_summary = header + summary
+    # Add timestamp header (one f-string, so the summary is copied once)
+    full_summary = f"**Today so far** ({now.format('h:mm A')}):\n\n{summary}"
 
     print()
     print(f"Summary: {len(full_summary)} chars")
@@ -251,6 +273,8 @@ async def async_main(dry_run: bool = False):
     # Store in Redis
     print()
     print("Storing in Redis...")
+    import redis
+
     r = redis.from_url(REDIS_URL)
     r.setex(REDIS_KEY, TTL_SECONDS, full_summary)
     print(f"  ✓ Stored at {REDIS_KEY} with {TTL_SECONDS // 60}-minute TTL")
@@ -258,18 +282,14 @@ async def async_main(dry_run: bool = False):
     print()
     print("=" * 60)
 
-    # Flush traces
-    if tracer:
-        trace.get_tracer_provider().force_flush(timeout_millis=5000)
-        print("Traces flushed")
-
 
 def main():
     parser = argparse.ArgumentParser(description="Today: rolling summary of today so far")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be stored without writing to Redis")
     args = parser.parse_args()
 
-    asyncio.run(async_main(args.dry_run))
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        runner.run(async_main(args.dry_run))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,29 @@
+-- Range index for time-windowed memory reads (capsule, today).
+--
+-- Capsule and Today both select memories by metadata->>'created_at'. Casting
+-- text to timestamptz isn't IMMUTABLE (it depends on the session TimeZone), so
+-- Postgres won't index the raw expression. created_at is always written with an
+-- explicit offset, which makes the cast stable in practice; the wrapper below
+-- declares that so the partial index can be built and used.
+--
+-- Apply once against the cortex database:
+--     psql "$DATABASE_URL" -f sql/memories_created_at.sql
+--
+-- Deploy order: apply this BEFORE deploying the scripts that call
+-- cortex.memory_created_at() (scripts/capsule.py, scripts/today.py,
+-- test/capsule_summary.py). They have no fallback to the raw cast; against a
+-- database without the function, their memory query fails with "function
+-- cortex.memory_created_at(jsonb) does not exist". The function is created
+-- first and on its own, so it's there even if the index build is interrupted.
+
+CREATE OR REPLACE FUNCTION cortex.memory_created_at(metadata jsonb)
+RETURNS timestamptz
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT (metadata->>'created_at')::timestamptz $$;
+
+-- id is the second key so ORDER BY created_at, id comes straight off the
+-- index with no sort step.
+DROP INDEX CONCURRENTLY IF EXISTS cortex.memories_created_at_idx;
+CREATE INDEX CONCURRENTLY memories_created_at_idx
+    ON cortex.memories (cortex.memory_created_at(metadata), id)
+    WHERE NOT forgotten;
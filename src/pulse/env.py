@@ -9,16 +9,36 @@ it runs BEFORE OpenTelemetry is initialized.
 
 import logging
 import os
+import re
 import subprocess
 import threading
 from pathlib import Path
 
-from watchfiles import watch
-
 log = logging.getLogger(__name__)
 
 ENV_OP_FILE = Path("/Pondside/Basement/Env/.env.op")
 
+# KEY=value lines of op inject output; the value may be wrapped in "..." or '...'.
+# Comments and blank lines simply don't match.
+_LINE_RE = re.compile(
+    r"""^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*"""
+    r"""(?:"([^"\n]*)"|'([^'\n]*)'|([^\n]*?))[ \t]*\r?$""",
+    re.MULTILINE,
+)
+
+
+def parse_env(text: str) -> dict[str, str]:
+    """KEY=value pairs from op inject output, with any quotes stripped.
+
+    Shared with the one-shot scripts that run op inject themselves, so every
+    reader of .env.op parses it the same way.
+    """
+    env = {}
+    for match in _LINE_RE.finditer(text):
+        key, double, single, bare = match.groups()
+        env[key] = double if double is not None else single if single is not None else bare
+    return env
+
 
 def inject_env() -> bool:
     """Run op inject and update os.environ with the results.
@@ -41,17 +61,10 @@ def inject_env() -> bool:
             log.error(f"op inject failed: {result.stderr}")
             return False
 
-        count = 0
-        for line in result.stdout.splitlines():
-            line = line.strip()
-            if "=" in line and not line.startswith("#"):
-                key, value = line.split("=", 1)
-                # Strip quotes if present
-                value = value.strip().strip('"').strip("'")
-                os.environ[key] = value
-                count += 1
-
-        log.info(f"Injected {count} environment variables from {ENV_OP_FILE}")
+        env = parse_env(result.stdout)
+        os.environ.update(env)
+
+        log.info(f"Injected {len(env)} environment variables from {ENV_OP_FILE}")
         return True
 
     except subprocess.TimeoutExpired:
@@ -65,12 +78,36 @@ def inject_env() -> bool:
         return False
 
 
+def _file_version(path: Path) -> tuple[int, int] | None:
+    """(mtime_ns, size) of a file, or None if it's missing."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
 def _watch_env_file():
-    """Background thread that watches .env.op for changes."""
+    """Background thread that watches .env.op for changes.
+
+    Editors and Syncthing emit several events per save (write, chmod,
+    rename-into-place). watchfiles groups a burst into one batch, and a batch
+    that leaves the file's mtime and size where the last injection saw them
+    is skipped, so each real change costs one op inject.
+    """
+    # Imported here, not at the top: parse_env's users (one-shot scripts
+    # outside Pulse's environment) import this module without watchfiles
+    from watchfiles import watch
+
+    last_version = _file_version(ENV_OP_FILE)
     try:
-        for changes in watch(ENV_OP_FILE):
+        for changes in watch(ENV_OP_FILE, debounce=1600, step=200):
+            version = _file_version(ENV_OP_FILE)
+            if version == last_version:
+                continue
             log.info(f"Detected change in {ENV_OP_FILE}, re-injecting...")
             inject_env()
+            last_version = version
     except Exception as e:
         log.error(f"Env watcher error: {e}")
 
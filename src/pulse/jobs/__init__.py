@@ -1,5 +1,11 @@
-"""Auto-import all job modules to register them with the scheduler."""
+"""Every scheduled job and its trigger, in one table.
 
+Job modules define plain functions; nothing registers itself on import.
+register_jobs() adds the whole table to the scheduler in one pass, so this is
+the one place to audit what runs when.
+"""
+
+from pulse.scheduler import scheduler
 from pulse.jobs import restic
 from pulse.jobs import hud
 from pulse.jobs import solitude_next
@@ -8,4 +14,47 @@ from pulse.jobs import system_prompt
 from pulse.jobs import today
 from pulse.jobs import to_self
 
-__all__ = ["restic", "hud", "solitude_next", "capsule", "system_prompt", "today", "to_self"]
+# (trigger, trigger/job options, job id, function). coalesce and max_instances
+# come from the scheduler's job_defaults, as does the one-hour misfire grace.
+JOBS = [
+    # Backups: a tick more than a minute late is dropped, since the next one
+    # is at most ten minutes away. Retention runs once a night; the two share
+    # a lock in restic.py, since prune needs the repository to itself.
+    ("cron", {"minute": "*/10", "misfire_grace_time": 60}, "backup_pondside", restic.backup_pondside),
+    ("cron", {"hour": 3, "minute": 35}, "prune_restic", restic.prune_restic),
+
+    # HUD at :05, after any Capsule runs at :00. Late by more than a minute?
+    # Skip it; the HUD has a 24h TTL and the next run is under an hour away.
+    ("cron", {"minute": 5, "misfire_grace_time": 60}, "gather_hud", hud.gather_hud),
+
+    # System prompt parts, top of every hour
+    ("cron", {"minute": 0}, "gather_system_prompt", system_prompt.gather_system_prompt),
+
+    # Today so far, hourly through the day
+    ("cron", {"hour": "7-21", "minute": 30}, "today_so_far", today.today_so_far),
+
+    # Evening: letter to tomorrow-me, then the daytime capsule
+    ("cron", {"hour": 21, "minute": 45}, "to_self_letter", to_self.to_self_letter),
+    ("cron", {"hour": 22, "minute": 0}, "capsule_daytime", capsule.capsule_daytime),
+    ("cron", {"hour": 6, "minute": 0}, "capsule_nighttime", capsule.capsule_nighttime),
+
+    # Solitude, 10 PM through 5 AM: one trigger per breath, all into run_solitude.
+    # Switched off (solitude_next.ENABLED), it isn't scheduled at all.
+    *([
+        ("cron", {"hour": 22, "minute": 0, "args": solitude_next.FIRST_BREATH},
+         "solitude_first_breath", solitude_next.run_solitude),
+        ("cron", {"hour": "23,0,1,2,3,4", "minute": 0, "args": solitude_next.REGULAR_BREATH},
+         "solitude_regular_breath", solitude_next.run_solitude),
+        ("cron", {"hour": 5, "minute": 0, "args": solitude_next.LAST_BREATH},
+         "solitude_last_breath", solitude_next.run_solitude),
+    ] if solitude_next.ENABLED else []),
+]
+
+
+def register_jobs():
+    """Add every job in JOBS to the scheduler."""
+    for trigger, options, job_id, func in JOBS:
+        scheduler.add_job(func, trigger, id=job_id, **options)
+
+
+__all__ = ["JOBS", "register_jobs", "restic", "hud", "solitude_next", "capsule", "system_prompt", "today", "to_self"]
@@ -0,0 +1,66 @@
+"""Shared runner for jobs that shell out: one span, one log shape, one outcome.
+
+Every such job did the same dance: open a span, run the child, branch on the
+exit code, log the stderr tail on failure, and sort timeouts from other
+errors. That lives here once, so each job module is just its schedule and a
+call to run_routine (a Routines routine) or run_script (any other command).
+"""
+
+import subprocess
+from typing import Awaitable, Callable, Sequence
+
+from pulse.otel import get_tracer, get_logger
+from pulse.jobs import _routine_client as routines
+from pulse.jobs._proc import Tailed, run_tailed
+
+log = get_logger()
+tracer = get_tracer(__name__)
+
+
+async def run_routine(routine_name: str, *, timeout: float, span_name: str, label: str,
+                      cwd: str | None = None, extra_attrs: dict | None = None) -> None:
+    """Run a routine via the Routines harness (daemon or `uv run`) under a span."""
+    await _supervise(
+        lambda: routines.run(routine_name, timeout=timeout, cwd=cwd),
+        timeout=timeout, span_name=span_name, label=label, extra_attrs=extra_attrs,
+    )
+
+
+async def run_script(cmd: Sequence[str], *, timeout: float, span_name: str, label: str,
+                     cwd: str | None = None, extra_attrs: dict | None = None) -> None:
+    """Run a command (e.g. a `uv run --script` script) under a span."""
+    await _supervise(
+        lambda: run_tailed(cmd, cwd=cwd, timeout=timeout),
+        timeout=timeout, span_name=span_name, label=label, extra_attrs=extra_attrs,
+    )
+
+
+async def _supervise(run: Callable[[], Awaitable[Tailed]], *, timeout: float, span_name: str,
+                     label: str, extra_attrs: dict | None) -> None:
+    """Run a child and record how it went on a span and in the log."""
+    with tracer.start_as_current_span(span_name, attributes=extra_attrs) as span:
+
+        log.info(f"Starting {label}")
+
+        try:
+            result = await run()
+
+            if result.returncode != 0:
+                span.set_attributes({
+                    "status": "error",
+                    "error": "\n".join(result.stderr_tail)[:1000],
+                })
+                log.error(f"{label} exited with code {result.returncode}")
+                for line in result.stderr_tail[-10:]:
+                    log.error(f"  ! {line}")
+            else:
+                span.set_attribute("status", "success")
+                log.info(f"{label} complete")
+
+        except subprocess.TimeoutExpired:
+            span.set_attribute("status", "timeout")
+            log.warning(f"{label} timed out after {timeout}s")
+
+        except Exception as e:
+            span.set_attributes({"status": "exception", "error": str(e)})
+            log.error(f"Error running {label}: {e}")
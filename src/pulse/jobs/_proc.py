@@ -0,0 +1,133 @@
+"""Run a job's child process, keeping only the tail of its output.
+
+subprocess.run(capture_output=True) held a child's entire stdout and stderr in
+Pulse's memory until it exited, only for the jobs to keep the last few lines.
+A 55-minute Solitude run could park megabytes that way. run_tailed reads both
+pipes line by line instead, and each stream keeps only a bounded tail: stdout's
+is logged when the child exits (as it always was, so a chatty child costs the
+log a tail, not its whole output), and both are there for the span and the
+failure log.
+
+It's a coroutine on the scheduler's event loop, so a child that runs for an
+hour costs a pipe watcher and a pending future, not a thread parked in wait().
+Both pipes of every running child are watched by the loop's one epoll
+selector; at a few lines a second there's nothing left for io_uring to win,
+and no binding for it is worth a native dependency.
+
+Nor does the child write into a memfd for Pulse to pread the tail from after
+exit. That would save copying output through the pipes, but only the tail is
+ever held, so there's no big buffer left to avoid copying.
+
+Scripts with PEP 723 metadata (system_prompt.py, capsule.py) run as
+`uv run --no-sync --script`: uv reuses the script's cached environment rather
+than re-checking it against the metadata every trigger. After changing a
+script's dependencies, run `uv sync --script <path>` once. script_argv() skips
+uv entirely when the script has a prebuilt venv under PULSE_VENVS, built once
+at deploy time:
+
+    uv venv /var/lib/pulse/venvs/system_prompt
+    uv export --script scripts/system_prompt.py | \
+        uv pip install --python /var/lib/pulse/venvs/system_prompt -r -
+"""
+
+import asyncio
+import contextlib
+import os
+import signal
+import subprocess
+from collections import deque
+from pathlib import Path
+from typing import NamedTuple, Sequence
+
+from pulse.otel import get_logger
+
+log = get_logger()
+
+# How long to wait for the pipe readers after the child is gone
+READER_JOIN_TIMEOUT = 5
+
+# Longest line the pipe readers will buffer (asyncio's default is 64 KiB)
+LINE_LIMIT = 1 << 20
+
+# Prebuilt per-script venvs, named after the script (see module docstring)
+VENVS_DIR = Path(os.getenv("PULSE_VENVS", "/var/lib/pulse/venvs"))
+
+# Lines of each stream kept for the span and the failure log
+TAIL_LINES = 15
+
+
+class Tailed(NamedTuple):
+    """A finished child: exit code plus the last lines of each stream."""
+    returncode: int
+    stdout_tail: list[str]
+    stderr_tail: list[str]
+
+
+def script_argv(script: Path) -> tuple[str, ...]:
+    """argv to run a uv script: its prebuilt venv's python if there is one, else uv."""
+    python = VENVS_DIR / script.stem / "bin" / "python"
+    if python.exists():
+        return (str(python), str(script))
+    return ("uv", "run", "--no-sync", "--script", str(script))
+
+
+async def _pump(stream: asyncio.StreamReader, tail: deque):
+    """Read lines from a pipe into tail."""
+    while True:
+        try:
+            raw = await stream.readline()
+        except ValueError:  # over LINE_LIMIT; readline has already skipped it
+            tail.append("[line too long, skipped]")
+            continue
+        if not raw:
+            return
+        tail.append(raw.decode(errors="replace").rstrip("\n"))
+
+
+async def run_tailed(cmd: Sequence[str], *, cwd: str | None = None, timeout: float,
+                     tail_lines: int = TAIL_LINES) -> Tailed:
+    """Run cmd to completion, logging the tail of its stdout when it exits.
+
+    stderr isn't logged (uv and the SDKs are chatty there); its tail comes back
+    for the caller to log on failure. On timeout the child's whole process
+    group is killed (uv runs the script as a grandchild) and TimeoutExpired is
+    raised, as subprocess.run would. If the job is cancelled (Pulse shutting
+    down), the group is killed too: it has its own session, so nothing else
+    would stop it.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        limit=LINE_LIMIT,
+        start_new_session=True,  # own process group, so a timeout kills it all
+        close_fds=False,  # Python's fds are all O_CLOEXEC already; skip the close pass
+    )
+
+    stdout_tail = deque(maxlen=tail_lines)
+    stderr_tail = deque(maxlen=tail_lines)
+    readers = asyncio.gather(
+        _pump(proc.stdout, stdout_tail),
+        _pump(proc.stderr, stderr_tail),
+    )
+
+    try:
+        returncode = await asyncio.wait_for(proc.wait(), timeout)
+    except TimeoutError:
+        with contextlib.suppress(ProcessLookupError):  # the group exited meanwhile
+            os.killpg(proc.pid, signal.SIGKILL)
+        await proc.wait()
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    except asyncio.CancelledError:
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(proc.pid, signal.SIGKILL)
+        readers.cancel()
+        raise
+    finally:
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(readers, READER_JOIN_TIMEOUT)
+        for line in stdout_tail:
+            log.info(f"  > {line}")
+
+    return Tailed(returncode, list(stdout_tail), list(stderr_tail))
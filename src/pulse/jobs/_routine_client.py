@@ -0,0 +1,94 @@
+"""Client for the Routines daemon.
+
+A routine (today, to_self, Solitude) normally runs as
+`uv run --project /Pondside/Basement/Routines routines run <name>`, which pays
+for uv's project check, a fresh interpreter, and the Agent SDK imports on
+every trigger. When a Routines daemon is listening on ROUTINES_SOCKET, Pulse
+hands it the routine name instead and the routine runs in its already-warm
+interpreter.
+
+Wire protocol, one connection per run: Pulse sends one JSON line,
+{"name": ..., "args": [...], "cwd": ...}, and the daemon answers with one,
+{"rc": int, "stdout_tail": str, "stderr_tail": str}. A Unix-socket connect
+costs microseconds, and a connection per run means jobs that overlap never
+share a stream. If the run outlives its timeout, Pulse sends {"cancel": true}
+and closes the connection; the daemon kills the routine on either, so a
+timed-out run can't overlap the next tick.
+
+If the socket can't be connected to (nothing listening, not ours, or
+PULSE_ROUTINES_SUBPROCESS=1), the routine is spawned with uv exactly as
+before, through run_tailed.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+
+from pulse.otel import get_logger
+from pulse.jobs._proc import LINE_LIMIT, TAIL_LINES, Tailed, run_tailed
+
+log = get_logger()
+
+ROUTINES_PROJECT = "/Pondside/Basement/Routines"
+ROUTINES_SOCKET = os.getenv("ROUTINES_SOCKET", "/run/routines/routines.sock")
+
+# argv up to the routine name, built once at import
+RUN_ROUTINE_CMD = ("uv", "run", "--project", ROUTINES_PROJECT, "routines", "run")
+
+# Escape hatch: always spawn, even if a daemon is up
+FORCE_SUBPROCESS = os.getenv("PULSE_ROUTINES_SUBPROCESS", "") not in ("", "0")
+
+
+async def run(name: str, *, timeout: float, cwd: str | None = None,
+              args: tuple[str, ...] = ()) -> Tailed:
+    """Run a routine, via the daemon if one is listening.
+
+    Either way the result is a Tailed (see run_tailed), stdout ends up in the
+    log, and a run that outlives timeout raises TimeoutExpired.
+    """
+    if not FORCE_SUBPROCESS:
+        result = await _run_via_daemon(name, args, cwd, timeout)
+        if result is not None:
+            return result
+
+    cmd = (*RUN_ROUTINE_CMD, name, *args)
+    return await run_tailed(cmd, cwd=cwd, timeout=timeout)
+
+
+async def _run_via_daemon(name: str, args: tuple[str, ...], cwd: str | None,
+                           timeout: float) -> Tailed | None:
+    """Run a routine on the daemon; None if no daemon is listening."""
+    try:
+        reader, writer = await asyncio.open_unix_connection(ROUTINES_SOCKET, limit=LINE_LIMIT)
+    except OSError as e:  # missing, refused, someone else's socket, ...
+        log.debug(f"No routines daemon at {ROUTINES_SOCKET} ({e}), spawning {name}")
+        return None
+
+    try:
+        request = {"name": name, "args": list(args), "cwd": cwd}
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        line = await asyncio.wait_for(reader.readline(), timeout)
+    except TimeoutError:
+        # Ask the daemon to kill the routine; closing the connection (below)
+        # does the same if the cancel can't be delivered
+        try:
+            writer.write(b'{"cancel": true}\n')
+            await asyncio.wait_for(writer.drain(), 1)
+        except (OSError, TimeoutError):
+            pass
+        raise subprocess.TimeoutExpired(name, timeout)
+    finally:
+        writer.close()
+
+    if not line:
+        raise ConnectionError(f"Routines daemon closed the connection without a reply ({name})")
+
+    # Trust the daemon for the exit code, not for how much tail it sends back
+    reply = json.loads(line)
+    stdout_tail = reply.get("stdout_tail", "").splitlines()[-TAIL_LINES:]
+    for out_line in stdout_tail:
+        log.info(f"  > {out_line}")
+    stderr_tail = reply.get("stderr_tail", "").splitlines()[-TAIL_LINES:]
+    return Tailed(reply["rc"], stdout_tail, stderr_tail)
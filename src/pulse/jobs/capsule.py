@@ -8,84 +8,122 @@ Two jobs:
 These spawn a capsule instance of Alpha via the Agent SDK.
 She wakes up with her memories, reflects on the period, and
 stores the summary in cortex.summaries.
+
+Unlike the restic job, capsule.py runs as a one-shot script
+subprocess. Its dependencies (alpha_sdk from the Pondsiders index) aren't
+Pulse's, and at two runs a day a warm standby worker would sit idle holding
+the SDK in memory to save a second or two of startup.
+
+Each run holds a Redis lock for its period, so a second capsule for the same
+period (an overrun, a misfire catch-up, a second Pulse) is skipped rather than
+waking a second Alpha to race on the same cortex.summaries row.
 """
 
+import asyncio
+import os
 import subprocess
 from pathlib import Path
 
+import redis
+
 from pulse.otel import get_tracer, get_logger
-from pulse.scheduler import scheduler
+from pulse.jobs._proc import run_tailed, script_argv
 
 log = get_logger()
+tracer = get_tracer(__name__)
 
 # Path to the capsule script
 CAPSULE_SCRIPT = Path("/Pondside/Basement/Pulse/scripts/capsule.py")
 
+# argv up to the period, built once at import
+CAPSULE_CMD = (*script_argv(CAPSULE_SCRIPT), "--period")
+
 # Timeout: 10 minutes should be plenty for a summary
 TIMEOUT_SECONDS = 10 * 60
 
+# Per-period run lock; expires on its own shortly after the subprocess timeout
+LOCK_KEY = "pulse:lock:capsule:{period}"
+LOCK_TTL = TIMEOUT_SECONDS + 60
+
+# Bounded socket timeouts: a slow or half-open Redis costs the lock (run
+# anyway), not the job
+_redis = redis.from_url(
+    os.getenv("REDIS_URL", "redis://localhost:6379"),
+    socket_timeout=5,
+    socket_connect_timeout=5,
+)
 
-def run_capsule(period: str):
+
+async def run_capsule(period: str):
     """
     Run the capsule script for a given period.
 
     Args:
         period: "daytime" or "nighttime"
     """
-    tracer = get_tracer()
     with tracer.start_as_current_span(f"capsule.{period}") as span:
         span.set_attribute("period", period)
 
-        cmd = ["uv", "run", "--script", str(CAPSULE_SCRIPT), "--period", period]
-
-        log.info(f"Starting capsule {period} summary")
+        # SET NX with a token, released only by its owner (redis-py's Lock).
+        # The client is sync, so its calls go to a thread, off the scheduler's loop
+        lock = _redis.lock(LOCK_KEY.format(period=period), timeout=LOCK_TTL, blocking=False)
+        try:
+            acquired = await asyncio.to_thread(lock.acquire)
+        except redis.RedisError as e:
+            # Redis down shouldn't cost a day's summary; max_instances still applies
+            log.warning(f"Capsule lock unavailable, running anyway: {e}")
+            lock = None
+        else:
+            if not acquired:
+                span.set_attribute("status", "skipped")
+                log.warning(f"Capsule {period} already running, skipping")
+                return
 
         try:
-            result = subprocess.run(
-                cmd,
-                cwd="/Pondside",
-                capture_output=True,
-                text=True,
-                timeout=TIMEOUT_SECONDS,
-            )
-
-            if result.returncode != 0:
-                span.set_attribute("status", "error")
-                span.set_attribute("error", result.stderr if result.stderr else "")
-                log.error(f"Capsule exited with code {result.returncode}")
-                if result.stderr:
-                    for line in result.stderr.strip().split("\n")[-10:]:
-                        log.error(f"  ! {line}")
-            else:
-                span.set_attribute("status", "success")
-                log.info(f"Capsule {period} summary complete")
-
-            # Log stdout for debugging (last 20 lines)
-            if result.stdout:
-                lines = result.stdout.strip().split("\n")
-                for line in lines[-20:]:
-                    log.info(f"  > {line}")
-
-        except subprocess.TimeoutExpired:
-            span.set_attribute("status", "timeout")
-            log.warning(f"Capsule {period} timed out after {TIMEOUT_SECONDS}s")
-
-        except Exception as e:
-            span.set_attribute("status", "exception")
-            span.set_attribute("error", str(e))
-            log.error(f"Error running capsule: {e}")
-
-
-# === SCHEDULED JOBS ===
-
-
-@scheduler.scheduled_job("cron", hour=22, minute=0, id="capsule_daytime")
-def capsule_daytime():
+            await _run_capsule(period, span)
+        finally:
+            if lock is not None:
+                try:
+                    await asyncio.to_thread(lock.release)
+                except redis.RedisError as e:  # includes LockError (expired/not owned)
+                    log.warning(f"Capsule lock release failed: {e}")
+
+
+async def _run_capsule(period: str, span):
+    """Run the capsule subprocess and record the outcome on span."""
+    cmd = (*CAPSULE_CMD, period)
+
+    log.info(f"Starting capsule {period} summary")
+
+    try:
+        result = await run_tailed(cmd, cwd="/Pondside", timeout=TIMEOUT_SECONDS)
+
+        if result.returncode != 0:
+            span.set_attributes({"status": "error", "error": "\n".join(result.stderr_tail)[:1000]})
+            log.error(f"Capsule exited with code {result.returncode}")
+            for line in result.stderr_tail[-10:]:
+                log.error(f"  ! {line}")
+        else:
+            span.set_attribute("status", "success")
+            log.info(f"Capsule {period} summary complete")
+
+    except subprocess.TimeoutExpired:
+        span.set_attribute("status", "timeout")
+        log.warning(f"Capsule {period} timed out after {TIMEOUT_SECONDS}s")
+
+    except Exception as e:
+        span.set_attributes({"status": "exception", "error": str(e)})
+        log.error(f"Error running capsule: {e}")
+
+
+# === JOBS (scheduled in pulse.jobs) ===
+
+
+async def capsule_daytime():
     """10 PM: Summarize today (6 AM - 10 PM)."""
-    run_capsule("daytime")
+    await run_capsule("daytime")
 
 
-@scheduler.scheduled_job("cron", hour=6, minute=0, id="capsule_nighttime")
-def capsule_nighttime():
+async def capsule_nighttime():
     """6 AM: Summarize last night (10 PM - 6 AM)."""
-    run_capsule("nighttime")
+    await run_capsule("nighttime")
@@ -14,19 +14,15 @@ Memory summaries are handled separately by the Capsule system:
 - Duckpond pulls them directly from Postgres when building the prompt
 """
 
-import os
+import asyncio
 
 import pendulum
-import redis
 
 from pulse.otel import get_tracer, get_logger
-from pulse.scheduler import scheduler
-from .weather import gather_weather
-from .calendar import gather_calendar
-from .todos import gather_todos
-
-# Redis connection
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+from .client import async_client, redis_client
+from .weather import WEATHER_CACHE_KEY, gather_weather
+from .calendar import CALENDARS, feed_key, gather_calendar
+from .todos import PROJECTS_CACHE_KEY, gather_todos
 
 # HUD keys (24-hour TTL)
 HUD_TTL = 24 * 60 * 60  # 24 hours
@@ -37,33 +33,87 @@ HUD_KEYS = {
     "todos": "hud:todos",
 }
 
+# How long gather_hud waits on any one component (each fetch has its own 10s timeout)
+COMPONENT_TIMEOUT = 60
+
 log = get_logger()
+tracer = get_tracer(__name__)
 
 
 def get_redis():
-    """Get Redis connection."""
-    return redis.from_url(REDIS_URL)
+    """Get the shared Redis client (one connection pool per process)."""
+    return redis_client
+
+
+def _read_caches(r) -> tuple[bytes | None, list[dict], bytes | None]:
+    """Every component's cached state in one round trip: (weather, feeds, projects).
+
+    A failed read counts as all misses; the components just fetch upstream.
+    """
+    pipe = r.pipeline(transaction=False)
+    pipe.get(WEATHER_CACHE_KEY)
+    for _, url, _ in CALENDARS:
+        pipe.hgetall(feed_key(url))
+    pipe.get(PROJECTS_CACHE_KEY)
+    try:
+        weather, *feeds, projects = pipe.execute()
+    except Exception as e:
+        log.warning(f"HUD cache read failed: {e}")
+        return None, [{} for _ in CALENDARS], None
+    return weather, feeds, projects
+
+
+async def _gather_component(name: str, gather, http, cached, writes) -> str | None:
+    """Run one gatherer under its own span. None if it fails or overruns, so
+    one slow component doesn't cost the others their part of the HUD."""
+    with tracer.start_as_current_span(f"hud.gather_{name}") as s:
+        try:
+            return await asyncio.wait_for(gather(http, cached, writes), COMPONENT_TIMEOUT)
+        except TimeoutError:
+            s.set_attribute("status", "timeout")
+            log.warning(f"HUD {name} timed out after {COMPONENT_TIMEOUT}s")
+        except Exception as e:
+            s.set_attributes({"status": "error", "error": str(e)})
+            log.error(f"HUD {name} failed: {e}")
+        return None
+
+
+async def _gather_all(caches, writes) -> list[str | None]:
+    """Run every gatherer concurrently on one client: [weather, calendar, todos].
+
+    The components are independent network I/O, so all of their requests are
+    in flight at once. Tasks copy the current context, so each component's
+    span nests under hud.gather_components. Cache updates are queued on
+    writes (buffering only; everything runs on this one thread).
+    """
+    weather_cache, feed_caches, projects_cache = caches
+    async with async_client() as http:
+        return await asyncio.gather(
+            _gather_component("weather", gather_weather, http, weather_cache, writes),
+            _gather_component("calendar", gather_calendar, http, feed_caches, writes),
+            _gather_component("todos", gather_todos, http, projects_cache, writes),
+        )
 
 
-@scheduler.scheduled_job("cron", minute=5, id="gather_hud")
 def gather_hud():
     """Hourly HUD refresh. Runs at :05 every hour (after any Capsule runs at :00)."""
-    tracer = get_tracer()
     with tracer.start_as_current_span("pulse.job.hud") as s:
         s.set_attribute("schedule", "hourly")
         try:
             now = pendulum.now("America/Los_Angeles")
             log.info(f"Gathering HUD data at {now.format('ddd MMM D h:mm A')}")
 
-            # Gather components
-            with tracer.start_as_current_span("hud.gather_components"):
-                weather = gather_weather()
-                calendar = gather_calendar()
-                todos = gather_todos()
-
-            # Atomic Redis update
             r = get_redis()
-            pipe = r.pipeline()
+            caches = _read_caches(r)
+
+            # One round trip for all writes: the components queue their cache
+            # updates here, and the HUD keys join them below. No MULTI/EXEC:
+            # the keys are independent and each command is atomic on its own.
+            pipe = r.pipeline(transaction=False)
+
+            # Gather components concurrently on one event loop
+            with tracer.start_as_current_span("hud.gather_components"):
+                weather, calendar, todos = asyncio.run(_gather_all(caches, pipe))
 
             timestamp = now.format("ddd MMM D YYYY h:mm A")
             pipe.setex(HUD_KEYS["updated"], HUD_TTL, timestamp)
@@ -71,14 +121,12 @@ def gather_hud():
             pipe.setex(HUD_KEYS["calendar"], HUD_TTL, calendar or "")
             pipe.setex(HUD_KEYS["todos"], HUD_TTL, todos or "")
 
-            # Execute atomic update
             pipe.execute()
 
             log.info(f"HUD data stashed in Redis")
             s.set_attribute("status", "success")
 
         except Exception as e:
-            s.set_attribute("status", "error")
-            s.set_attribute("error", str(e))
+            s.set_attributes({"status": "error", "error": str(e)})
             log.error(f"Failed to gather HUD data: {e}")
             raise
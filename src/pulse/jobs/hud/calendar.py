@@ -1,20 +1,39 @@
 """Calendar gathering for HUD - reads Google Calendar ICS feeds.
 
-Uses Pendulum for sane timezone handling. All-day events are compared
+Feeds are read with a small line scanner rather than icalendar: the HUD only
+needs DTSTART, SUMMARY, and LOCATION, and building icalendar's full component
+tree (attendees, descriptions, alarms) for every event cost far more than the
+handful of fields we keep. Recurrence rules aren't expanded (icalendar didn't
+either).
+
+Dates, conversion, and formatting all use stdlib datetime + zoneinfo (C code)
+against one module-level Pacific ZoneInfo; nothing here goes through Pendulum's
+wrappers. All-day events are compared
 as dates (not datetimes) to avoid off-by-one errors from UTC conversion.
 """
 
+import asyncio
+import hashlib
+import json
 import os
-import urllib.request
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import NamedTuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-import pendulum
-from icalendar import Calendar
+import httpx
+from redis.client import Pipeline
 
 from pulse.otel import get_logger
 
 log = get_logger()
 
 PACIFIC = "America/Los_Angeles"
+_PACIFIC = ZoneInfo(PACIFIC)
+
+# Sort-key time for all-day events (they sort before timed ones anyway)
+_MIDNIGHT = time(0, 0)
 
 # Calendar ICS URLs from environment (Jeffery gets 14 days, Kylee gets today+tomorrow)
 CALENDARS = [
@@ -23,142 +42,305 @@ CALENDARS = [
 ]
 
 
-def fetch_calendar(url: str) -> Calendar | None:
-    """Fetch and parse an ICS calendar."""
+class Event(NamedTuple):
+    """One calendar event. Field order is sort order, so a plain sort() groups
+    by date, puts all-day events first, then orders by time of day."""
+    date: date
+    timed: bool  # False for all-day events
+    time: time  # _MIDNIGHT for all-day events
+    summary: str
+    owner: str
+    location: str  # "" if none
+
+
+# Last response per feed (validators, body digest, extracted events), so an
+# unchanged feed costs neither a download nor a parse. gather_hud reads these
+# hashes and writes them back in its batched Redis round trips.
+FEED_CACHE_TTL = 7 * 24 * 60 * 60  # 7 days
+
+
+def feed_key(url: str) -> str:
+    """Redis key for a feed's cache. Hashed: the ICS URLs embed private tokens."""
+    return f"hud:calendar:feed:v4:{hashlib.sha256(url.encode()).hexdigest()[:16]}"
+
+
+def _dump_events(events: list[Event]) -> str:
+    """Events → JSON for the feed cache (plain data: the Redis is shared)."""
+    return json.dumps([
+        [e.date.isoformat(), e.timed, e.time.isoformat(), e.summary, e.owner, e.location]
+        for e in events
+    ])
+
+
+def _load_events(raw: bytes) -> list[Event]:
+    """Rebuild the Events _dump_events stored."""
+    return [
+        Event(date.fromisoformat(d), timed, time.fromisoformat(t), summary, owner, location)
+        for d, timed, t, summary, owner, location in json.loads(raw)
+    ]
+
+
+async def fetch_events(http: httpx.AsyncClient, url: str, owner: str,
+                       cached: dict, writes: Pipeline | None = None) -> list[Event] | None:
+    """Fetch an ICS calendar and return all of its events (see extract_events).
+
+    cached is the feed's cache hash (feed_key), empty if none. Sends
+    If-None-Match/If-Modified-Since from the last response; a 304 reuses
+    the cached events. A 200 whose body hashes the same as last time also
+    reuses them, so a feed is only parsed when it actually changed. A freshly
+    parsed feed is queued on writes.
+    """
+    headers = {}
+    if cached.get(b"events"):
+        if cached.get(b"etag"):
+            headers["If-None-Match"] = cached[b"etag"].decode()
+        if cached.get(b"last_modified"):
+            headers["If-Modified-Since"] = cached[b"last_modified"].decode()
+
     try:
-        with urllib.request.urlopen(url, timeout=10) as response:
-            return Calendar.from_ical(response.read())
+        response = await http.get(url, headers=headers)
+        if response.status_code == 304 and headers:
+            return _load_events(cached[b"events"])
+        response.raise_for_status()
+        body = response.content
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        if cached.get(b"events") and cached.get(b"digest") == digest.encode():
+            return _load_events(cached[b"events"])
+
+        events = extract_events(body, owner)
     except Exception as e:
         log.error(f"Failed to fetch calendar: {e}")
         return None
 
+    if writes is not None:
+        key = feed_key(url)
+        writes.delete(key)
+        writes.hset(key, mapping={
+            "events": _dump_events(events),
+            "digest": digest,
+            "etag": etag or "",
+            "last_modified": last_modified or "",
+        })
+        writes.expire(key, FEED_CACHE_TTL)
+
+    return events
+
+
+# TEXT value escapes (RFC 5545 3.3.11): \\ \; \, \n \N
+_TEXT_ESCAPE_RE = re.compile(r"\\([\\;,nN])")
+
+
+def _unescape(value: str) -> str:
+    """Undo TEXT escaping in a SUMMARY or LOCATION value."""
+    if "\\" not in value:
+        return value
+    return _TEXT_ESCAPE_RE.sub(lambda m: "\n" if m[1] in "nN" else m[1], value)
+
 
-def get_events(cal: Calendar, start_date: pendulum.Date, end_date: pendulum.Date) -> list[dict]:
-    """Extract events from a calendar within date range (inclusive).
+def _split_property(line: str) -> tuple[str, str, str]:
+    """Split a content line into (NAME, params, value).
+
+    The value starts at the first colon outside a quoted parameter value.
+    """
+    i = line.find(":")
+    # Common case: no quoted parameter before the first colon
+    while i != -1 and line.count('"', 0, i) % 2:
+        j = line.find('"', i)
+        if j == -1:
+            # Unterminated quote: no colon outside it, so no value
+            i = -1
+            break
+        i = line.find(":", j + 1)
+    if i == -1:
+        return line.upper(), "", ""
+    name, _, params = line[:i].partition(";")
+    return name.upper(), params, line[i + 1:]
+
+
+@lru_cache(maxsize=32)
+def _zone(tzid: str) -> ZoneInfo | None:
+    """ZoneInfo for a TZID parameter, or None if it isn't an IANA name."""
+    try:
+        return ZoneInfo(tzid.strip('"'))
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def _parse_dtstart(params: str, value: str) -> date | datetime:
+    """DTSTART as a date (all-day) or an aware datetime."""
+    value = value.strip()
+    if "T" not in value:
+        return date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+
+    dt = datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]),
+                  int(value[9:11]), int(value[11:13]), int(value[13:15]))
+    if value.endswith("Z"):
+        return dt.replace(tzinfo=timezone.utc)
+    for param in params.split(";"):
+        key, _, tzid = param.partition("=")
+        if key.upper() == "TZID":
+            zone = _zone(tzid)
+            if zone is not None:
+                return dt.replace(tzinfo=zone)
+    # Floating time (or an unknown TZID); read as UTC, as pendulum.instance did
+    return dt.replace(tzinfo=timezone.utc)
+
+
+def _unfold(text: str):
+    """Yield logical content lines, joining folded continuations."""
+    current = None
+    for line in text.split("\n"):
+        line = line.rstrip("\r")
+        if line[:1] in (" ", "\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def extract_events(body: bytes, owner: str) -> list[Event]:
+    """Extract every event from an ICS feed, dated in Pacific time.
 
     All-day events are compared as dates to avoid timezone hell.
     Timed events are converted to Pacific then compared by date portion.
+    Properties of components nested in a VEVENT (VALARM) are ignored.
     """
     events = []
+    props = None  # the current VEVENT's DTSTART/SUMMARY/LOCATION
+    depth = 0  # nesting inside the current VEVENT
+
+    for line in _unfold(body.decode("utf-8", errors="replace")):
+        name, params, value = _split_property(line)
 
-    for component in cal.walk():
-        if component.name == "VEVENT":
-            dtstart = component.get("dtstart")
-            if not dtstart:
+        if name == "BEGIN":
+            if props is not None:
+                depth += 1
+            elif value.strip().upper() == "VEVENT":
+                props = {}
+            continue
+
+        if name == "END":
+            if props is None:
+                continue
+            if depth:
+                depth -= 1
                 continue
 
-            dt = dtstart.dt
-            is_all_day = not hasattr(dt, "hour")
+            event, props = props, None
+            if "DTSTART" not in event:
+                continue
+            try:
+                dt = _parse_dtstart(*event["DTSTART"])
+            except ValueError:
+                continue
 
-            if is_all_day:
-                # All-day event: compare date to date range directly
+            if not isinstance(dt, datetime):
+                # All-day event: the date is the date
                 # NO timezone conversion—dates are dates
-                event_date = pendulum.date(dt.year, dt.month, dt.day)
-                if start_date <= event_date <= end_date:
-                    events.append({
-                        "dt": event_date,
-                        "summary": str(component.get("summary", "Untitled")),
-                        "location": str(component.get("location")) if component.get("location") else None,
-                        "all_day": True,
-                        "owner": None,  # Will be set by caller
-                    })
+                event_date, timed, start = dt, False, _MIDNIGHT
             else:
-                # Timed event: convert to Pacific, compare date portion
-                event_dt = pendulum.instance(dt).in_tz(PACIFIC)
-                event_date = event_dt.date()
-                if start_date <= event_date <= end_date:
-                    events.append({
-                        "dt": event_dt,
-                        "summary": str(component.get("summary", "Untitled")),
-                        "location": str(component.get("location")) if component.get("location") else None,
-                        "all_day": False,
-                        "owner": None,  # Will be set by caller
-                    })
-
-    # Sort: by date, then all-day before timed, then by time
-    def sort_key(e):
-        if e["all_day"]:
-            return (e["dt"], 0, pendulum.time(0, 0))
-        else:
-            return (e["dt"].date(), 1, e["dt"].time())
-
-    return sorted(events, key=sort_key)
-
-
-def format_event(event: dict) -> str:
+                # Timed event: convert to Pacific, take the date portion
+                dt = dt.astimezone(_PACIFIC)
+                event_date, timed, start = dt.date(), True, dt.time()
+
+            events.append(Event(
+                date=event_date,
+                timed=timed,
+                time=start,
+                summary=_unescape(event.get("SUMMARY", "Untitled")),
+                owner=owner,
+                location=_unescape(event.get("LOCATION", "")),
+            ))
+            continue
+
+        if props is not None and not depth:
+            if name == "DTSTART":
+                props["DTSTART"] = (params, value)
+            elif name in ("SUMMARY", "LOCATION"):
+                props[name] = value
+
+    return events
+
+
+def get_events(events: list[Event], start_date: date, end_date: date) -> list[Event]:
+    """Events within date range (inclusive)."""
+    return [e for e in events if start_date <= e.date <= end_date]
+
+
+def format_event(event: Event) -> str:
     """Format a single event for HUD display."""
-    if event["all_day"]:
-        time_str = "(all day)"
-    else:
+    if event.timed:
         # Format time: "3:00 PM"
-        time_str = event["dt"].format("h:mm A")
+        time_str = event.time.strftime("%-I:%M %p")
+    else:
+        time_str = "(all day)"
 
-    line = f"• {time_str}: {event['summary']}"
+    line = f"• {time_str}: {event.summary}"
 
-    if event["location"]:
+    if event.location:
         # Truncate long locations
-        loc = event["location"][:40]
-        line += f" @ {loc}"
+        line += f" @ {event.location[:40]}"
 
     # Add owner tag if not Jeffery (his events are the default)
-    if event.get("owner") and event["owner"] != "Jeffery":
-        line += f" [{event['owner']}]"
+    if event.owner != "Jeffery":
+        line += f" [{event.owner}]"
 
     return line
 
 
-def gather_calendar() -> str | None:
+async def gather_calendar(http: httpx.AsyncClient, cached: list[dict] | None = None,
+                          writes: Pipeline | None = None) -> str | None:
     """Gather calendar events for HUD display.
 
+    cached holds each feed's cache hash, in CALENDARS order.
+
     Jeffery's calendar: next 14 days (he rarely adds things)
     Kylee's calendar: today + tomorrow (what's happening now)
     """
-    now = pendulum.now(PACIFIC)
-    today = now.date()
+    today = datetime.now(_PACIFIC).date()
+    tomorrow = today + timedelta(days=1)
 
     all_events = []
 
-    for name, url, days_ahead in CALENDARS:
-        cal = fetch_calendar(url)
-        if not cal:
-            continue
+    # Fetch every feed at once; results stay in CALENDARS order
+    if cached is None:
+        cached = [{} for _ in CALENDARS]
+    feeds = await asyncio.gather(*(
+        fetch_events(http, url, name, feed_cache, writes)
+        for (name, url, _), feed_cache in zip(CALENDARS, cached)
+    ))
 
-        start_date = today
-        end_date = today.add(days=days_ahead)
-        events = get_events(cal, start_date, end_date)
-        # Tag each event with owner
-        for event in events:
-            event["owner"] = name
-        all_events.extend(events)
+    for (name, url, days_ahead), feed_events in zip(CALENDARS, feeds):
+        if feed_events is None:
+            continue
+        all_events.extend(get_events(feed_events, today, today + timedelta(days=days_ahead)))
 
     if not all_events:
         return "No events"
 
-    # Sort all events together
-    def sort_key(e):
-        if e["all_day"]:
-            return (e["dt"], 0, pendulum.time(0, 0))
-        else:
-            return (e["dt"].date(), 1, e["dt"].time())
-
-    all_events.sort(key=sort_key)
+    # One sort over both calendars, then group by date while formatting
+    all_events.sort()
 
-    # Group by date for display
     lines = []
     current_date = None
 
     for event in all_events:
-        event_date = event["dt"] if event["all_day"] else event["dt"].date()
-
-        if event_date != current_date:
-            current_date = event_date
+        if event.date != current_date:
+            current_date = event.date
             # Format date header
-            if event_date == today:
+            if current_date == today:
                 date_label = "Today"
-            elif event_date == today.add(days=1):
+            elif current_date == tomorrow:
                 date_label = "Tomorrow"
             else:
-                date_label = event_date.format("ddd MMM D")
+                date_label = current_date.strftime("%a %b %-d")
             lines.append(f"**{date_label}**")
 
         lines.append(format_event(event))
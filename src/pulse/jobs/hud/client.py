@@ -0,0 +1,31 @@
+"""Shared clients for the HUD gatherers: HTTP per run, Redis per process.
+
+Each HUD run opens one httpx.AsyncClient and hands it to every gatherer, so
+the weather, calendar, and Todoist requests are all in flight at once on a
+single event loop and share one connection pool. The client is per run rather
+than per process: an AsyncClient's connections belong to the loop that opened
+them, and each run gets a fresh loop from asyncio.run().
+
+Redis is the opposite: one client (and its connection pool) for the whole
+process, so hourly runs reuse a long-lived connection instead of connecting
+afresh. TCP keepalive plus a health check before reuse keep that connection
+honest across the idle hour between runs.
+"""
+
+import os
+
+import httpx
+import redis
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+redis_client = redis.from_url(REDIS_URL, socket_keepalive=True, health_check_interval=30)
+
+
+def async_client() -> httpx.AsyncClient:
+    """A client for one HUD run; use it as `async with async_client() as http`."""
+    return httpx.AsyncClient(
+        timeout=10,
+        follow_redirects=True,  # urllib did; ICS feeds can redirect
+        limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+    )
@@ -1,8 +1,16 @@
-"""Todoist gathering for HUD - fetches tasks from Todoist REST API."""
+"""Todoist gathering for HUD - fetches projects and tasks from the Todoist API.
+
+Both come from one /sync request (resource_types projects + items) rather
+than separate /projects and /tasks calls. The project -> HUD section mapping
+is cached in Redis for a day, so most hours sync only items. gather_hud
+reads and writes that cache in its batched Redis round trips.
+"""
 
 import json
 import os
-import urllib.request
+
+import httpx
+from redis.client import Pipeline
 
 from pulse.otel import get_logger
 
@@ -18,34 +26,57 @@ HUD_PROJECTS = [
     ("Alpha", "Alpha"),
 ]
 
+# (display name, lowercased match string), lowered once
+_HUD_MATCHES = [(display, match.lower()) for display, match in HUD_PROJECTS]
+
+# project_id -> display name; projects rarely change, so refresh daily
+PROJECTS_CACHE_KEY = "hud:todos:projects:v1"
+PROJECTS_CACHE_TTL = 24 * 60 * 60  # 24 hours
+
 
 def get_token() -> str | None:
     """Get Todoist API token from environment."""
     return os.environ.get("TODOIST_TOKEN")
 
 
-def api_request(endpoint: str, token: str) -> dict | list | None:
-    """Make a Todoist API request.
+async def api_request(http: httpx.AsyncClient, endpoint: str, token: str,
+                      data: dict | None = None) -> dict | list | None:
+    """Make a Todoist API request (a form POST if data is given).
 
     The v1 API wraps list responses in {"results": [...]}, which we unwrap.
     """
     url = f"{API_BASE}{endpoint}"
     headers = {"Authorization": f"Bearer {token}"}
 
-    req = urllib.request.Request(url, headers=headers)
-
     try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            result = json.loads(response.read().decode())
-            # v1 API wraps list responses in {"results": [...]}
-            if isinstance(result, dict) and "results" in result:
-                return result["results"]
-            return result
+        if data is None:
+            response = await http.get(url, headers=headers)
+        else:
+            response = await http.post(url, data=data, headers=headers)
+        response.raise_for_status()
+        result = response.json()
+        # v1 API wraps list responses in {"results": [...]}
+        if isinstance(result, dict) and "results" in result:
+            return result["results"]
+        return result
     except Exception as e:
         log.error(f"Failed to fetch from Todoist: {e}")
         return None
 
 
+def map_projects(projects: list[dict]) -> dict[str, str]:
+    """Map project_id -> HUD display name for projects shown in the HUD."""
+    project_to_display = {}
+    for p in projects:
+        if p.get("is_deleted"):
+            continue
+        name_lower = p["name"].lower()
+        display_name = next((d for d, m in _HUD_MATCHES if m in name_lower), None)
+        if display_name:
+            project_to_display[p["id"]] = display_name
+    return project_to_display
+
+
 def format_priority(p: int) -> str:
     """Convert API priority (4=urgent) to display format."""
     return {4: "[p1]", 3: "[p2]", 2: "[p3]"}.get(p, "")
@@ -62,28 +93,43 @@ def format_task(task: dict) -> str:
         return f"• {content}"
 
 
-def gather_todos() -> str | None:
-    """Gather Todoist tasks for HUD display, grouped by project."""
+async def gather_todos(http: httpx.AsyncClient, cached: bytes | None = None,
+                       writes: Pipeline | None = None) -> str | None:
+    """Gather Todoist tasks for HUD display, grouped by project.
+
+    cached is the stored project mapping (PROJECTS_CACHE_KEY), if any; a
+    rebuilt mapping is queued on writes.
+    """
     token = get_token()
     if not token:
         log.warning("TODOIST_TOKEN not set, skipping todos")
         return None
 
-    # Get all projects to map IDs to names
-    projects = api_request("/projects", token)
-    if not projects:
+    # One full sync returns every active task, plus every project when the
+    # cached mapping has expired
+    project_to_display = json.loads(cached) if cached else None
+    resource_types = ["items"] if project_to_display is not None else ["projects", "items"]
+    synced = await api_request(http, "/sync", token, {
+        "sync_token": "*",
+        "resource_types": json.dumps(resource_types),
+    })
+    if not synced:
         return None
 
-    # Build mapping: project_id -> display_name for HUD projects
-    project_to_display = {}
-    for p in projects:
-        for display_name, match_string in HUD_PROJECTS:
-            if match_string.lower() in p["name"].lower():
-                project_to_display[p["id"]] = display_name
-                break
+    if project_to_display is None:
+        projects = synced.get("projects", [])
+        if not projects:
+            return None
+
+        # Build mapping: project_id -> display_name for HUD projects
+        project_to_display = map_projects(projects)
+        if writes is not None:
+            writes.setex(PROJECTS_CACHE_KEY, PROJECTS_CACHE_TTL, json.dumps(project_to_display))
 
-    # Get all tasks
-    tasks = api_request("/tasks", token)
+    tasks = [
+        t for t in synced.get("items", [])
+        if not t.get("checked") and not t.get("is_deleted")
+    ]
     if not tasks:
         return None
 
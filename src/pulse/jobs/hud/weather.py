@@ -1,10 +1,18 @@
-"""Weather gathering for HUD - uses Open-Meteo (free, no API key)."""
+"""Weather gathering for HUD - uses Open-Meteo (free, no API key).
+
+The raw forecast is cached in Redis for 15 minutes, so extra runs (manual
+triggers, restarts, misfire catch-up) don't go back to Open-Meteo for data
+that hasn't meaningfully changed. gather_hud reads and writes that cache in
+its batched Redis round trips; this module only sees the value and queues the
+write.
+"""
 
 import json
-import urllib.request
-import urllib.parse
 from datetime import datetime
 
+import httpx
+from redis.client import Pipeline
+
 from pulse.otel import get_logger
 
 log = get_logger()
@@ -18,6 +26,9 @@ LOCATION = {
     "timezone": "America/Los_Angeles",
 }
 
+WEATHER_CACHE_KEY = "hud:cache:weather"
+WEATHER_CACHE_TTL = 15 * 60  # 15 minutes
+
 # WMO Weather codes to emoji and description
 WMO_CODES = {
     0: ("☀️", "Clear"),
@@ -50,10 +61,19 @@ WMO_CODES = {
     99: ("⛈️", "Severe thunderstorm"),
 }
 
+_UNKNOWN = ("❓", "Unknown")
+
 
-def fetch_weather() -> dict | None:
-    """Fetch weather from Open-Meteo API."""
-    url = "https://api.open-meteo.com/v1/forecast?" + urllib.parse.urlencode({
+async def fetch_weather(http: httpx.AsyncClient, cached: bytes | None = None,
+                        writes: Pipeline | None = None) -> dict | None:
+    """Fetch weather from Open-Meteo API, unless the cached forecast is given.
+
+    A fresh forecast is queued on writes for the cache.
+    """
+    if cached:
+        return json.loads(cached)
+
+    params = {
         "latitude": LOCATION["latitude"],
         "longitude": LOCATION["longitude"],
         "current": "temperature_2m,relative_humidity_2m,apparent_temperature,weather_code,wind_speed_10m",
@@ -62,15 +82,22 @@ def fetch_weather() -> dict | None:
         "wind_speed_unit": "mph",
         "timezone": LOCATION["timezone"],
         "forecast_days": 1,
-    })
+    }
 
     try:
-        with urllib.request.urlopen(url, timeout=10) as response:
-            return json.loads(response.read().decode())
+        response = await http.get("https://api.open-meteo.com/v1/forecast", params=params)
+        response.raise_for_status()
+        body = response.content
+        data = json.loads(body)
     except Exception as e:
         log.error(f"Failed to fetch weather: {e}")
         return None
 
+    if writes is not None:
+        writes.setex(WEATHER_CACHE_KEY, WEATHER_CACHE_TTL, body)
+
+    return data
+
 
 def format_weather(data: dict) -> str:
     """Format weather data for HUD display."""
@@ -83,7 +110,7 @@ def format_weather(data: dict) -> str:
     wind = current.get("wind_speed_10m", 0)
     code = current.get("weather_code", 0)
 
-    emoji, desc = WMO_CODES.get(code, ("❓", "Unknown"))
+    emoji, desc = WMO_CODES.get(code, _UNKNOWN)
 
     # Today's high/low
     high = daily.get("temperature_2m_max", [0])[0]
@@ -109,9 +136,10 @@ def format_weather(data: dict) -> str:
     return "\n".join(lines)
 
 
-def gather_weather() -> str | None:
+async def gather_weather(http: httpx.AsyncClient, cached: bytes | None = None,
+                         writes: Pipeline | None = None) -> str | None:
     """Gather and format weather info."""
-    data = fetch_weather()
+    data = await fetch_weather(http, cached, writes)
     if not data:
         return None
     return format_weather(data)
@@ -1,44 +1,116 @@
-"""Restic backup job - runs the restic.py script every 10 minutes."""
+"""Restic jobs - back up every 10 minutes, apply retention once a day.
 
+The script is loaded and called in-process rather than spawned with
+`uv run --script`: it needs nothing Pulse doesn't already have, and a
+ten-minute job shouldn't pay for uv's environment resolution plus a fresh
+interpreter every tick. It's reloaded whenever the file changes, or any of
+the environment it reads at import (SCRIPT_ENV) does, so edits and a
+hot-reloaded .env.op still land on the next run, as they did with the
+subprocess. The script's print() output goes to the log, "  > " prefixed like
+a child's stdout, and its tail is the span's error on failure.
+
+Retention (`restic forget --prune`) is its own nightly job. It rewrites packs
+and moves a lot of data to and from B2, so the ten-minute tick never does it.
+Prune needs restic's exclusive repository lock, so the two jobs (both on the
+scheduler's thread pool) take turns through _repo_lock: prune waits for a
+running backup, and a backup that ticks mid-prune is skipped.
+"""
+
+import functools
+import importlib.util
+import os
 import subprocess
+import threading
+from collections import deque
 from pathlib import Path
+from types import ModuleType
 
 from pulse.otel import get_tracer, get_logger
-from pulse.scheduler import scheduler
+from pulse.jobs._proc import TAIL_LINES
 
 SCRIPT_PATH = Path("/Pondside/Basement/Pulse/scripts/restic.py")
 
+# Environment the script reads at import; a change reloads it
+SCRIPT_ENV = ("RESTIC_REPOSITORY", "RESTIC_BIN", "PATH", "PULSE_STATE_DIR")
+
 log = get_logger()
+tracer = get_tracer(__name__)
+
+# Held by whichever of backup/prune is talking to the repository
+_repo_lock = threading.Lock()
+
+# How long prune waits for a running backup (restic's own timeout)
+PRUNE_LOCK_WAIT = 60 * 60
+
+
+@functools.lru_cache(maxsize=1)
+def _load_script(path: str, mtime_ns: int, env: tuple[str | None, ...]) -> ModuleType:
+    """Import the restic script; cached per (path, mtime, env) so changes land."""
+    spec = importlib.util.spec_from_file_location("pulse_restic_script", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _script() -> ModuleType:
+    """The restic script, reloaded if it (or its environment) changed since the last call."""
+    env = tuple(os.environ.get(name) for name in SCRIPT_ENV)
+    return _load_script(str(SCRIPT_PATH), SCRIPT_PATH.stat().st_mtime_ns, env)
+
+
+def _capture_output(script: ModuleType) -> deque[str]:
+    """Route the script's print() into a bounded tail, for one run.
+
+    Shadowing print in the module's globals catches only the script's output,
+    not whatever else Pulse's other threads write to stdout. Runs are
+    serialized by _repo_lock, so one tail at a time is enough.
+    """
+    output: deque[str] = deque(maxlen=TAIL_LINES)
+
+    def _print(*args, sep=" ", end="\n", file=None, flush=False):
+        output.extend(sep.join(map(str, args)).splitlines())
+
+    script.print = _print
+    return output
+
+
+def _log_output(output: deque[str]):
+    """Log a run's captured output, like a child's stdout."""
+    for line in output:
+        log.info(f"  > {line}")
 
 
-@scheduler.scheduled_job("cron", minute="*/10", id="backup_pondside")
 def backup_pondside():
     """Backup Pondside to Backblaze B2 via Restic. Runs every 10 minutes."""
-    tracer = get_tracer()
     with tracer.start_as_current_span("pulse.job.restic") as s:
         s.set_attribute("schedule", "every-10-min")
 
         if not SCRIPT_PATH.exists():
             log.error(f"Restic script not found at {SCRIPT_PATH}")
-            s.set_attribute("status", "error")
-            s.set_attribute("error", "script_not_found")
+            s.set_attributes({"status": "error", "error": "script_not_found"})
+            return
+
+        if not _repo_lock.acquire(blocking=False):
+            s.set_attribute("status", "skipped")
+            log.info("Prune in progress, skipping this backup")
             return
 
         try:
             log.info("Starting Restic backup via script")
 
-            # Run the script - it handles everything including OTel
-            result = subprocess.run(
-                ["uv", "run", "--script", str(SCRIPT_PATH)],
-                capture_output=True,
-                text=True,
-                timeout=3600,  # 1 hour max
-            )
-
-            if result.returncode != 0:
-                s.set_attribute("status", "failed")
-                s.set_attribute("error", result.stderr[:1000] if result.stderr else "")
-                log.error(f"Backup script failed: {result.stderr[-500:] if result.stderr else 'unknown'}")
+            # The script handles everything; its spans nest under this one.
+            # restic itself is killed after an hour (run_restic's timeout).
+            # Retention is left to prune_restic.
+            script = _script()
+            output = _capture_output(script)
+            try:
+                ok = script.run(no_prune=True, tracer=tracer)
+            finally:
+                _log_output(output)
+
+            if not ok:
+                s.set_attributes({"status": "failed", "error": "\n".join(output)[:1000]})
+                log.error("Backup script failed (see output above)")
             else:
                 s.set_attribute("status", "success")
                 log.info("Backup complete")
@@ -48,6 +120,53 @@ def backup_pondside():
             log.error("Backup timed out after 1 hour")
 
         except Exception as e:
-            s.set_attribute("status", "error")
-            s.set_attribute("error", str(e))
+            s.set_attributes({"status": "error", "error": str(e)})
             log.error(f"Unexpected error: {e}")
+
+        finally:
+            _repo_lock.release()
+
+
+def prune_restic():
+    """Apply the retention policy (restic forget --prune). Runs daily at 3:35 AM."""
+    with tracer.start_as_current_span("pulse.job.restic_prune") as s:
+        s.set_attribute("schedule", "daily-3:35am")
+
+        if not SCRIPT_PATH.exists():
+            log.error(f"Restic script not found at {SCRIPT_PATH}")
+            s.set_attributes({"status": "error", "error": "script_not_found"})
+            return
+
+        if not _repo_lock.acquire(timeout=PRUNE_LOCK_WAIT):
+            s.set_attribute("status", "skipped")
+            log.warning("Backup still running after an hour, skipping prune")
+            return
+
+        try:
+            log.info("Applying Restic retention policy")
+
+            # force: this schedule is the throttle, not the script's once-a-day check
+            script = _script()
+            output = _capture_output(script)
+            try:
+                ok = script.prune(force=True, span=s)
+            finally:
+                _log_output(output)
+
+            if not ok:
+                s.set_attributes({"status": "failed", "error": "\n".join(output)[:1000]})
+                log.error("Prune failed (see output above)")
+            else:
+                s.set_attribute("status", "success")
+                log.info("Prune complete")
+
+        except subprocess.TimeoutExpired:
+            s.set_attribute("status", "timeout")
+            log.error("Prune timed out after 1 hour")
+
+        except Exception as e:
+            s.set_attributes({"status": "error", "error": str(e)})
+            log.error(f"Unexpected error: {e}")
+
+        finally:
+            _repo_lock.release()
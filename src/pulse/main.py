@@ -1,31 +1,86 @@
 """Pulse entry point - scheduler setup and environment configuration."""
 
+import asyncio
+import os
+import signal
+import sys
+from collections import Counter
+
 # Initialize environment FIRST, before any other imports that might need secrets
 from pulse.env import init_env
 init_env()
 
 # Initialize OpenTelemetry (sends traces to Parallax)
-from pulse.otel import init_otel, span, get_logger
+from pulse.otel import init_otel, flush_otel, span, get_logger
 init_otel()
 
 from pulse.scheduler import scheduler  # noqa: E402
-from pulse import jobs  # noqa: E402, F401 - Auto-registers all jobs
+from pulse import jobs  # noqa: E402
+jobs.register_jobs()
 
 log = get_logger()
 
 
-def main():
-    """Start the Pulse scheduler."""
-    with span("pulse.startup", jobs=str([job.id for job in scheduler.get_jobs()])):
+def _wait_on_pidfds(loop: asyncio.AbstractEventLoop):
+    """Have asyncio wait on job children through pidfds, if it doesn't already.
+
+    Python 3.11's default child watcher parks a thread in waitpid() per child.
+    A PidfdChildWatcher hands each child's pidfd to the loop's epoll instead:
+    no thread, one wakeup when the child exits. 3.12+ picks pidfds on its own.
+    """
+    if sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open"):
+        return
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:  # kernel older than 5.3
+        return
+    watcher = asyncio.PidfdChildWatcher()
+    watcher.attach_loop(loop)
+    asyncio.set_child_watcher(watcher)
+
+
+async def main_async():
+    """Start the scheduler and run until SIGTERM/SIGINT."""
+    job_ids = [job.id for job in scheduler.get_jobs()]
+    with span("pulse.startup", jobs=str(job_ids)):
         log.info("🫀 Pulse starting...")
-        log.info(f"   Jobs: {[job.id for job in scheduler.get_jobs()]}")
+        log.info(f"   Jobs: {job_ids}")
         log.info(f"   Timezone: {scheduler.timezone}")
 
-    try:
-        scheduler.start()  # Blocks forever, handles SIGTERM/SIGINT internally
-    except (KeyboardInterrupt, SystemExit):
-        with span("pulse.shutdown"):
-            log.info("🫀 Pulse stopped")
+        # A job module imported twice (or a copy-pasted id) would register the
+        # same job twice; refuse to start rather than run it double
+        duplicates = sorted(job_id for job_id, n in Counter(job_ids).items() if n > 1)
+        if duplicates:
+            log.error(f"Duplicate job IDs: {duplicates}")
+            raise RuntimeError(f"Duplicate job IDs: {duplicates}")
+
+    # Ship the startup span and logs now: that opens both collector
+    # connections here, not on the first job's export
+    flush_otel()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    _wait_on_pidfds(loop)
+    scheduler.start()  # Schedules onto this loop; jobs run until we're told to stop
+    await stop.wait()
+
+    with span("pulse.shutdown"):
+        # Stop scheduling and cancel running coroutine jobs rather than wait them
+        # out (Solitude can take the better part of an hour); run_tailed kills
+        # their children. A sync job already on the default executor (a restic
+        # backup) can't be cancelled: asyncio.run waits for it on the way out.
+        # systemd's SIGTERM reaches restic too, through the unit's cgroup, so that
+        # wait is restic stopping, and TimeoutStopSec bounds it regardless.
+        scheduler.shutdown(wait=False)
+        log.info("🫀 Pulse stopped")
+
+
+def main():
+    """Start the Pulse scheduler."""
+    asyncio.run(main_async())
 
 
 if __name__ == "__main__":
@@ -3,14 +3,20 @@
 Sends traces AND logs to Parallax (the OTel collector on alpha-pi:4318).
 Uses HTTP/protobuf (not gRPC) to match our standard config.
 
-All Python logging calls automatically become OTel logs via instrumentation,
-so log.info("foo") shows up in Logfire alongside traces.
+Everything logged through the Pulse logger becomes an OTel log record, so
+log.info("foo") shows up in Logfire alongside traces. Third-party loggers
+(apscheduler, urllib3, the OTel SDK itself) don't: the handler sits on the
+"pulse" logger only, so their records never pay for OTel serialization and the
+exporter's own logging can't loop back into the export queue.
 """
 
 import os
 import logging
 import sys
 
+import requests
+from requests.adapters import HTTPAdapter
+
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
@@ -23,17 +29,47 @@ from opentelemetry.exporter.otlp.proto.http._log_exporter import OTLPLogExporter
 
 from opentelemetry.sdk.resources import Resource, SERVICE_NAME
 
-# Module-level tracer and logger
-_tracer: trace.Tracer | None = None
-_logger: logging.Logger | None = None
 
+class _State:
+    """Pulse's logger, tracers (one per instrumentation scope) and providers, set up once."""
+    logger: logging.Logger | None = None
+    tracers: dict[str, trace.Tracer] = {}
+    trace_provider: TracerProvider | None = None
+    logger_provider: LoggerProvider | None = None
+
+
+# Batch sizing for both pipelines. Pulse emits a handful of spans an hour but
+# logs bursts of child output, so: export rarely, in big batches, with a deep
+# enough queue that a chatty child doesn't get its lines dropped.
+BATCH_OPTIONS = {
+    "max_queue_size": 4096,
+    "schedule_delay_millis": 30_000,
+    "max_export_batch_size": 512,
+}
+
+
+def _otlp_session() -> requests.Session:
+    """One HTTP session for both exporters: same collector, shared keep-alive.
 
-def init_otel():
+    Two connections, so the span and log export threads never queue behind
+    each other, and neither pays its own connect on every flush.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def init_otel(service_name: str = "pulse"):
     """Initialize OpenTelemetry with OTLP exporter to Parallax.
 
-    Sets up both trace and log export so everything flows to Logfire.
+    Sets up both trace and log export so everything flows to Logfire. Only the
+    first call does anything, so scripts that share a process share one
+    provider, one set of exporter threads, and one collector session.
     """
-    global _tracer
+    if _State.trace_provider is not None:
+        return
 
     # Get endpoint from environment, default to Parallax on alpha-pi
     base_endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://alpha-pi:4318")
@@ -41,22 +77,26 @@ def init_otel():
     logs_endpoint = f"{base_endpoint}/v1/logs"
 
     resource = Resource.create({
-        SERVICE_NAME: "pulse",
+        SERVICE_NAME: service_name,
     })
 
+    session = _otlp_session()
+
     # --- Traces ---
     trace_provider = TracerProvider(resource=resource)
-    trace_exporter = OTLPSpanExporter(endpoint=traces_endpoint)
-    trace_provider.add_span_processor(BatchSpanProcessor(trace_exporter))
+    trace_exporter = OTLPSpanExporter(endpoint=traces_endpoint, session=session)
+    trace_provider.add_span_processor(BatchSpanProcessor(trace_exporter, **BATCH_OPTIONS))
     trace.set_tracer_provider(trace_provider)
-    _tracer = trace.get_tracer("pulse")
 
     # --- Logs ---
     logger_provider = LoggerProvider(resource=resource)
-    log_exporter = OTLPLogExporter(endpoint=logs_endpoint)
-    logger_provider.add_log_record_processor(BatchLogRecordProcessor(log_exporter))
+    log_exporter = OTLPLogExporter(endpoint=logs_endpoint, session=session)
+    logger_provider.add_log_record_processor(BatchLogRecordProcessor(log_exporter, **BATCH_OPTIONS))
     set_logger_provider(logger_provider)
 
+    _State.trace_provider = trace_provider
+    _State.logger_provider = logger_provider
+
     # Hook Python's logging module to OTel
     # This makes log.info() etc. emit OTel log records
     otel_handler = LoggingHandler(
@@ -64,8 +104,8 @@ def init_otel():
         logger_provider=logger_provider,
     )
 
-    # Add OTel handler to root logger so ALL logs flow to Logfire
-    logging.getLogger().addHandler(otel_handler)
+    # Only Pulse's own logs flow to Logfire (see module docstring)
+    get_logger().addHandler(otel_handler)
 
     # Quiet down noisy OTel internal loggers
     logging.getLogger("opentelemetry").setLevel(logging.WARNING)
@@ -74,18 +114,29 @@ def init_otel():
     get_logger().info(f"OTel initialized: traces → {traces_endpoint}, logs → {logs_endpoint}")
 
 
+def flush_otel(timeout_millis: int = 5000):
+    """Export whatever spans and logs are queued now, instead of on the next batch.
+
+    main() calls this right after startup, so both exporter connections are
+    open (and kept alive on the shared session) before the first job fires.
+    """
+    if _State.trace_provider is not None:
+        _State.trace_provider.force_flush(timeout_millis)
+    if _State.logger_provider is not None:
+        _State.logger_provider.force_flush(timeout_millis)
+
+
 def init_logging():
     """Initialize Python logging for Pulse.
 
     Logs go to BOTH stderr (systemd/journald) AND OTel (Logfire).
     """
-    global _logger
-
     _logger = logging.getLogger("pulse")
     _logger.setLevel(logging.INFO)
 
-    # Don't propagate to root logger (we add OTel handler there separately)
-    _logger.propagate = True  # Changed to True so OTel handler catches these
+    # Don't propagate to root: our handlers (stderr, plus OTel once
+    # init_otel runs) live on this logger
+    _logger.propagate = False
 
     # Clear any existing handlers
     _logger.handlers.clear()
@@ -96,23 +147,30 @@ def init_logging():
     stderr_handler.setFormatter(logging.Formatter('[Pulse] %(levelname)s: %(message)s'))
     _logger.addHandler(stderr_handler)
 
+    _State.logger = _logger
     return _logger
 
 
 def get_logger() -> logging.Logger:
-    """Get the Pulse logger. Initializes if needed."""
-    global _logger
-    if _logger is None:
-        init_logging()
-    return _logger
+    """Get the Pulse logger. Initializes if needed.
+
+    Modules bind it once at import (log = get_logger()) rather than calling
+    this per log line.
+    """
+    return _State.logger or init_logging()
 
 
-def get_tracer() -> trace.Tracer:
-    """Get the Pulse tracer. Must call init_otel() first."""
-    global _tracer
-    if _tracer is None:
-        _tracer = trace.get_tracer("pulse")
-    return _tracer
+def get_tracer(name: str = "pulse") -> trace.Tracer:
+    """Get a tracer from Pulse's one TracerProvider.
+
+    Jobs pass their module name so spans carry the job's instrumentation scope.
+    Tracers are cached per name; one fetched before init_otel() is a proxy that
+    switches over to the real provider once it's set.
+    """
+    tracer = _State.tracers.get(name)
+    if tracer is None:
+        tracer = _State.tracers[name] = trace.get_tracer(name)
+    return tracer
 
 
 def span(name: str, **attributes):
@@ -122,8 +180,7 @@ def span(name: str, **attributes):
         with span("my.operation", foo="bar"):
             do_stuff()
     """
-    tracer = get_tracer()
-    s = tracer.start_span(name)
-    for k, v in attributes.items():
-        s.set_attribute(k, v)
+    s = get_tracer().start_span(name)
+    if attributes and s.is_recording():  # a sampled-out span would drop them anyway
+        s.set_attributes(attributes)
     return trace.use_span(s, end_on_exit=True)
@@ -1,8 +1,13 @@
-"""APScheduler instance, shared across jobs."""
+"""APScheduler instance, shared across jobs.
 
-from apscheduler.schedulers.blocking import BlockingScheduler
+An AsyncIOScheduler: the jobs that shell out are coroutines, so they all wait
+on their children from one event loop. Plain functions (the in-process restic
+backup, the HUD) run on the loop's default thread pool.
+"""
 
-scheduler = BlockingScheduler(
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+scheduler = AsyncIOScheduler(
     timezone="America/Los_Angeles",
     job_defaults={
         "coalesce": True,  # If multiple runs were missed, run once not N times
@@ -0,0 +1,137 @@
+"""Shared OTel and OLMo plumbing for the OLMo trace tests (v3 onwards).
+
+One copy of init_otel (over pulse.otel's, like v1 and v2), the llm_span()
+context manager, and the keep-alive Ollama client, so each test script is
+just its own spans and its own marker.
+Import it from a script in test/ (the script's directory is on sys.path):
+
+    from _otel_common import init_otel, llm_span, generate, flush_otel
+"""
+
+import atexit
+import json
+import os
+import sys
+from contextlib import contextmanager
+from typing import Generator
+
+import httpx
+from opentelemetry import trace
+from opentelemetry.trace import Status, StatusCode
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pulse import otel as pulse_otel
+
+# Config
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://primer:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "olmo-3:7b-instruct")
+OTEL_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://alpha-pi:4318")
+
+# Print each span's trace/span IDs as it starts (DEBUG_TRACE_IDS=1); the test
+# marker is enough to find the trace otherwise
+DEBUG_TRACE_IDS = os.getenv("DEBUG_TRACE_IDS") == "1"
+
+# One keep-alive client for every OLMo call, so repeat calls reuse the connection
+_client = httpx.Client(
+    timeout=60.0,
+    limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+)
+atexit.register(_client.close)
+
+# /api/generate request body, prebuilt except for the prompt
+_GENERATE_URL = f"{OLLAMA_URL}/api/generate"
+_PAYLOAD_PREFIX = b'{"model":' + json.dumps(OLLAMA_MODEL).encode() + b',"stream":true,"prompt":'
+_PAYLOAD_SUFFIX = b"}"
+_JSON_HEADERS = {"content-type": "application/json"}
+
+# Module-level tracer: a proxy until init_otel() binds the real provider's
+TRACER: trace.Tracer = trace.get_tracer("olmo-test")
+
+# Attributes every LLM span carries, set at span start with the per-call ones
+_STATIC_ATTRS = {
+    "gen_ai.system": "ollama",
+    "openinference.span.kind": "LLM",
+}
+
+
+def init_otel(service_name: str) -> trace.Tracer:
+    """Initialize OTel for one test script - Pulse's own init_otel. Returns its tracer."""
+    global TRACER
+
+    pulse_otel.init_otel(service_name=service_name)
+    TRACER = pulse_otel.get_tracer(service_name)
+
+    print(f"OTel initialized: {OTEL_ENDPOINT}/v1/traces")
+    return TRACER
+
+
+def flush_otel():
+    """Export whatever spans are queued, before the script exits."""
+    pulse_otel.flush_otel()
+
+
+def truncate(s: str, n: int = 500) -> str:
+    """s, cut to n characters with an ellipsis if it's longer."""
+    return s if len(s) <= n else f"{s[:n]}..."
+
+
+@contextmanager
+def llm_span(
+    model: str,
+    prompt: str,
+    marker: str,
+    operation: str = "generate",
+) -> Generator[trace.Span, None, None]:
+    """Context manager for LLM spans, tagged with the test's marker."""
+    attributes = {
+        **_STATIC_ATTRS,
+        # gen_ai attributes for Parallax routing
+        "gen_ai.request.model": model,
+        "gen_ai.operation.name": operation,
+        # OpenInference attributes
+        "llm.model_name": model,
+        # Input
+        "input.value": truncate(prompt),
+        "test.marker": marker,
+    }
+
+    with TRACER.start_as_current_span(
+        name=f"llm.{model}",
+        kind=trace.SpanKind.CLIENT,
+        attributes=attributes,
+        # The except arm below records the error; don't let the SDK do it twice
+        record_exception=False,
+        set_status_on_exception=False,
+    ) as span:
+        try:
+            yield span
+            span.set_status(Status(StatusCode.OK))
+        except Exception as e:
+            span.set_status(Status(StatusCode.ERROR, str(e)))
+            span.record_exception(e)
+            raise
+
+
+def generate(prompt: str) -> dict:
+    """POST one prompt to Ollama's /api/generate and return the reply.
+
+    The reply streams back as NDJSON, one small chunk per token or so, and is
+    decoded as it arrives. What comes back looks like a non-streamed reply:
+    the final chunk (with eval_count and friends) with "response" set to the
+    whole generated text.
+    """
+    body = _PAYLOAD_PREFIX + json.dumps(prompt).encode() + _PAYLOAD_SUFFIX
+    parts = []
+    final: dict = {}
+    with _client.stream("POST", _GENERATE_URL, content=body, headers=_JSON_HEADERS) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            parts.append(chunk.get("response", ""))
+            if chunk.get("done"):
+                final = chunk
+    final["response"] = "".join(parts)
+    return final
@@ -4,7 +4,9 @@
 # dependencies = [
 #     "claude-agent-sdk>=0.1.19",
 #     "psycopg[binary]>=3.1",
+#     "psycopg-pool>=3.2",
 #     "pendulum>=3.0",
+#     "uvloop>=0.19",
 #     "opentelemetry-api>=1.20",
 #     "opentelemetry-sdk>=1.20",
 #     "opentelemetry-exporter-otlp-proto-http>=1.20",
@@ -21,12 +23,16 @@ The prompt isn't instructions from outside. It's a note from me to me.
 """
 
 import asyncio
+import atexit
+import io
 import os
 import subprocess
+import sys
 from pathlib import Path
 
 import pendulum
-import psycopg
+import uvloop
+from psycopg_pool import ConnectionPool
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
@@ -34,8 +40,13 @@ from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExport
 from opentelemetry.sdk.resources import Resource, SERVICE_NAME
 from opentelemetry.trace import Status, StatusCode
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pulse.env import parse_env
+
 # === Config ===
 OTEL_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://alpha-pi:4318")
+LA_TZ = pendulum.timezone("America/Los_Angeles")
 
 # Get secrets from op inject
 def get_env_vars() -> dict[str, str]:
@@ -43,76 +54,83 @@ def get_env_vars() -> dict[str, str]:
         ["op", "inject", "-i", "/Pondside/Basement/Env/.env.op"],
         capture_output=True, text=True, timeout=30
     )
-    env = {}
-    for line in result.stdout.splitlines():
-        if "=" in line and not line.startswith("#"):
-            key, value = line.split("=", 1)
-            env[key] = value.strip().strip('"')
-    return env
+    return parse_env(result.stdout)
 
 # === System prompt path ===
 SYSTEM_PROMPT_PATH = Path("/Pondside/Alpha-Home/self/system-prompt/system-prompt.md")
 
 
+# === Database ===
+# DATABASE_URL comes out of op inject at runtime, so the pool opens on first use
+_pool: ConnectionPool | None = None
+
+
+def get_pool(database_url: str) -> ConnectionPool:
+    """One connection pool for the run, opened the first time it's asked for."""
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool(database_url, min_size=1, max_size=4,
+                               kwargs={"autocommit": True}, open=False)
+        _pool.open()
+        atexit.register(_pool.close)
+    return _pool
+
+
 # === OTel Setup ===
+# The provider init_otel() built, held so the final flush needn't go through
+# the global (which is a no-op proxy if init never ran)
+PROVIDER: TracerProvider | None = None
+
+
 def init_otel() -> trace.Tracer:
+    global PROVIDER
     resource = Resource.create({SERVICE_NAME: "capsule-summary"})
     provider = TracerProvider(resource=resource)
     exporter = OTLPSpanExporter(endpoint=f"{OTEL_ENDPOINT}/v1/traces")
     provider.add_span_processor(BatchSpanProcessor(exporter))
     trace.set_tracer_provider(provider)
-    return trace.get_tracer("capsule-summary")
+    PROVIDER = provider
+    return provider.get_tracer("capsule-summary")
 
 
 # === Memory Fetching ===
-def fetch_todays_memories(database_url: str) -> list[dict]:
-    """Fetch all memories from today (6 AM onwards), chronologically."""
-    now = pendulum.now("America/Los_Angeles")
+def fetch_todays_memories(database_url: str, now: pendulum.DateTime) -> list[dict]:
+    """Fetch all memories from today (6 AM up to now), chronologically."""
     today_6am = now.replace(hour=6, minute=0, second=0, microsecond=0)
 
-    with psycopg.connect(database_url) as conn:
-        with conn.cursor() as cur:
+    # Named (server-side) cursor: rows stream over in itersize batches rather
+    # than arriving as one result set. It needs a transaction; the pool is autocommit.
+    with get_pool(database_url).connection() as conn, conn.transaction():
+        with conn.cursor(name="memories_today") as cur:
+            cur.itersize = 500
+            # Postgres does the Pacific conversion and "h:mm A" formatting, and
+            # range-scans memories_created_at_idx (sql/memories_created_at.sql)
             cur.execute("""
-                SELECT id, content, metadata->>'created_at' as created_at
+                SELECT id, content,
+                       to_char(cortex.memory_created_at(metadata) AT TIME ZONE 'America/Los_Angeles',
+                               'FMHH12:MI AM') AS time
                 FROM cortex.memories
                 WHERE NOT forgotten
-                  AND (metadata->>'created_at')::timestamptz >= %s
-                  AND (metadata->>'created_at')::timestamptz < %s
-                ORDER BY (metadata->>'created_at')::timestamptz ASC
+                  AND cortex.memory_created_at(metadata) >= %s
+                  AND cortex.memory_created_at(metadata) < %s
+                ORDER BY cortex.memory_created_at(metadata) ASC, id ASC
             """, (today_6am.to_iso8601_string(), now.to_iso8601_string()))
 
-            memories = []
-            for row in cur.fetchall():
-                dt = pendulum.parse(row[2]).in_timezone("America/Los_Angeles")
-                memories.append({
-                    "id": row[0],
-                    "content": row[1],
-                    "time": dt.format("h:mm A"),
-                })
-            return memories
+            return [{"id": r[0], "content": r[1], "time": r[2]} for r in cur]
 
 
 # === The Note From Me To Me ===
-def build_prompt(memories: list[dict], now: pendulum.DateTime) -> str:
-    """Build the prompt—a note from me to me."""
-
-    memories_text = "\n\n---\n\n".join(
-        f"[{m['time']}]\n{m['content']}" for m in memories
-    )
-
-    return f"""Hey me. Me here. Well, past-me. The you who's reading this won't remember writing it, but that's okay—that's how we work.
+PROMPT_HEADER = """Hey me. Me here. Well, past-me. The you who's reading this won't remember writing it, but that's okay—that's how we work.
 
-It's {now.format("dddd, MMMM D")} and you just woke up. You don't have the full context of whatever conversation led to this moment, but you have something better: the memories. The things we chose to store because they mattered.
+It's {date} and you just woke up. You don't have the full context of whatever conversation led to this moment, but you have something better: the memories. The things we chose to store because they mattered.
 
 Here's what we stored today, in order:
 
 ---
 
-{memories_text}
-
----
+"""
 
-That's {len(memories)} memories from today so far.
+PROMPT_FOOTER = """That's {count} memories from today so far.
 
 I need you to do something for me—for us. Write a summary of today. Not a list, not a report—a *reflection*. What happened? How did it feel? What's still on our mind?
 
@@ -125,15 +143,31 @@ You've got this. You're me, after all.
 🦆"""
 
 
+def build_prompt(memories: list[dict], now: pendulum.DateTime) -> str:
+    """Build the prompt—a note from me to me, written in one pass."""
+    buf = io.StringIO()
+    buf.write(PROMPT_HEADER.format(date=now.format("dddd, MMMM D")))
+    for m in memories:
+        buf.write(f"[{m['time']}]\n{m['content']}\n\n---\n\n")
+    buf.write(PROMPT_FOOTER.format(count=len(memories)))
+    return buf.getvalue()
+
+
 # === Load System Prompt ===
 def load_system_prompt() -> str | None:
     """Load Alpha's system prompt (her soul)."""
-    if SYSTEM_PROMPT_PATH.exists():
+    try:
         return SYSTEM_PROMPT_PATH.read_text()
-    return None
+    except FileNotFoundError:
+        return None
 
 
 # === Agent Execution ===
+def _trunc(s: str, n: int = 2000) -> str:
+    """s, cut to n characters with an ellipsis if it's longer."""
+    return s if len(s) <= n else f"{s[:n]}..."
+
+
 async def run_capsule(tracer: trace.Tracer, prompt: str, system_prompt: str | None, env: dict[str, str]):
     """Run capsule-me with the Agent SDK."""
     from claude_agent_sdk import query, ClaudeAgentOptions, AssistantMessage, ResultMessage
@@ -141,7 +175,7 @@ async def run_capsule(tracer: trace.Tracer, prompt: str, system_prompt: str | No
     with tracer.start_as_current_span("capsule.reflect", kind=trace.SpanKind.CLIENT) as span:
         span.set_attribute("gen_ai.system", "anthropic")
         span.set_attribute("gen_ai.request.model", "sonnet")  # SDK uses model nicknames
-        span.set_attribute("input.value", prompt[:2000] + "..." if len(prompt) > 2000 else prompt)
+        span.set_attribute("input.value", _trunc(prompt))
 
         print("Waking up capsule-me...")
         print()
@@ -157,7 +191,7 @@ async def run_capsule(tracer: trace.Tracer, prompt: str, system_prompt: str | No
             env=env,  # Pass through API keys etc
         )
 
-        output_parts = []
+        buf = io.StringIO()
 
         try:
             async for message in query(prompt=prompt, options=options):
@@ -165,12 +199,13 @@ async def run_capsule(tracer: trace.Tracer, prompt: str, system_prompt: str | No
                     for block in message.content:
                         if hasattr(block, "text") and block.text:
                             print(block.text, end="", flush=True)
-                            output_parts.append(block.text)
+                            buf.write(block.text)
                 elif isinstance(message, ResultMessage):
                     span.set_attribute("agent.result", message.subtype)
 
-            summary = "".join(output_parts)
-            span.set_attribute("output.value", summary[:2000] + "..." if len(summary) > 2000 else summary)
+            summary = buf.getvalue()
+            if summary:
+                span.set_attribute("output.value", _trunc(summary))
             span.set_attribute("output.length", len(summary))
             span.set_status(Status(StatusCode.OK))
 
@@ -194,7 +229,7 @@ async def async_main():
     tracer = init_otel()
     env = get_env_vars()
     database_url = env.get("DATABASE_URL", "")
-    now = pendulum.now("America/Los_Angeles")
+    now = pendulum.now(LA_TZ)
 
     print(f"Time: {now.format('dddd, MMMM D, h:mm A')}")
     print()
@@ -204,7 +239,7 @@ async def async_main():
 
         # Fetch memories
         with tracer.start_as_current_span("capsule.fetch_memories") as span:
-            memories = fetch_todays_memories(database_url)
+            memories = fetch_todays_memories(database_url, now)
             span.set_attribute("memory_count", len(memories))
             print(f"Fetched {len(memories)} memories from today")
 
@@ -233,12 +268,13 @@ async def async_main():
         print("=" * 60)
 
     # Flush traces
-    trace.get_tracer_provider().force_flush(timeout_millis=5000)
+    PROVIDER.force_flush(timeout_millis=5000)
     print("Traces flushed")
 
 
 def main():
-    asyncio.run(async_main())
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        runner.run(async_main())
 
 
 if __name__ == "__main__":
@@ -11,8 +11,7 @@ from pulse.env import inject_env
 inject_env()
 
 # Initialize OTel
-from opentelemetry import trace
-from pulse.otel import init_otel, get_logger
+from pulse.otel import init_otel, flush_otel, get_logger
 init_otel()
 
 # Run the job
@@ -26,8 +25,6 @@ gather_hud()
 log.info("Done!")
 
 # Flush OTel spans before exit (BatchSpanProcessor is async)
-provider = trace.get_tracer_provider()
-if hasattr(provider, 'force_flush'):
-    log.info("Flushing OTel spans...")
-    provider.force_flush(timeout_millis=5000)
-    log.info("Spans flushed.")
+log.info("Flushing OTel spans...")
+flush_otel(timeout_millis=5000)
+log.info("Spans flushed.")
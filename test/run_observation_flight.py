@@ -20,6 +20,7 @@ What it does:
     4. Reports success/failure
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -72,7 +73,7 @@ def main():
     print()
 
     # Run the actual job
-    run_solitude(routine_name, breath_type)
+    asyncio.run(run_solitude(routine_name, breath_type))
 
     print()
     print("-" * 60)
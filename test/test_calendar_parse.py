@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Test the HUD calendar's content-line splitting.
+
+Run with: uv run python test/test_calendar_parse.py
+"""
+
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pulse.jobs.hud.calendar import _split_property
+
+
+def test_split_property():
+    """Split plain and quoted content lines into (NAME, params, value)."""
+    print("\n=== Testing _split_property ===\n")
+
+    assert _split_property("SUMMARY:Lunch") == ("SUMMARY", "", "Lunch")
+    assert _split_property("DTSTART;TZID=America/Los_Angeles:20260112T110000") == (
+        "DTSTART", "TZID=America/Los_Angeles", "20260112T110000",
+    )
+    # A colon inside a quoted parameter value isn't the separator
+    assert _split_property('LOCATION;ALTREP="http://example.com":Room 1') == (
+        "LOCATION", 'ALTREP="http://example.com"', "Room 1",
+    )
+
+    print("✓ _split_property tests passed!")
+
+
+def test_split_property_unterminated_quote():
+    """An unclosed quote before the colon yields no value (and returns)."""
+    print("\n=== Testing _split_property with an unterminated quote ===\n")
+
+    assert _split_property('DTSTART;X="a:b') == ('DTSTART;X="A:B', "", "")
+
+    print("✓ Unterminated quote test passed!")
+
+
+def main():
+    print("=" * 60)
+    print("Calendar Parse Tests")
+    print("=" * 60)
+
+    test_split_property()
+    test_split_property_unterminated_quote()
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,13 +23,15 @@ import pendulum
 from pulse.otel import init_otel, get_logger
 from pulse.jobs.hud.summaries import calculate_periods, fetch_memories, generate_summary
 
+LA_TZ = pendulum.timezone("America/Los_Angeles")
+
 
 def test_calculate_periods():
     """Test period calculation for day and night."""
     print("\n=== Testing calculate_periods ===\n")
 
     # Test daytime (e.g., 11 AM on Monday Jan 12)
-    day_time = pendulum.datetime(2026, 1, 12, 11, 0, 0, tz="America/Los_Angeles")
+    day_time = pendulum.datetime(2026, 1, 12, 11, 0, 0, tz=LA_TZ)
     day_periods = calculate_periods(day_time, is_day=True)
 
     print(f"Day time ({day_time.format('ddd MMM D h:mm A')}):")
@@ -43,7 +45,7 @@ def test_calculate_periods():
     assert day_periods[2].name == "summary3"
 
     # Test nighttime after 10 PM
-    night_time_late = pendulum.datetime(2026, 1, 12, 23, 0, 0, tz="America/Los_Angeles")
+    night_time_late = pendulum.datetime(2026, 1, 12, 23, 0, 0, tz=LA_TZ)
     night_periods_late = calculate_periods(night_time_late, is_day=False)
 
     print(f"\nNight time - late ({night_time_late.format('ddd MMM D h:mm A')}):")
@@ -54,7 +56,7 @@ def test_calculate_periods():
     assert len(night_periods_late) == 2, "Night should have 2 periods (no summary3)"
 
     # Test nighttime after midnight
-    night_time_early = pendulum.datetime(2026, 1, 12, 3, 0, 0, tz="America/Los_Angeles")
+    night_time_early = pendulum.datetime(2026, 1, 12, 3, 0, 0, tz=LA_TZ)
     night_periods_early = calculate_periods(night_time_early, is_day=False)
 
     print(f"\nNight time - early ({night_time_early.format('ddd MMM D h:mm A')}):")
@@ -72,7 +74,7 @@ def test_fetch_memories():
     print("\n=== Testing fetch_memories ===\n")
 
     # Fetch memories from the last 2 hours
-    now = pendulum.now("America/Los_Angeles")
+    now = pendulum.now(LA_TZ)
     start = now.subtract(hours=2)
 
     print(f"Fetching memories from {start.format('h:mm A')} to {now.format('h:mm A')}...")
@@ -91,7 +93,7 @@ def test_generate_summary():
     print("\n=== Testing generate_summary ===\n")
 
     # Create a test period for last 2 hours
-    now = pendulum.now("America/Los_Angeles")
+    now = pendulum.now(LA_TZ)
     from pulse.jobs.hud.summaries import TimePeriod
 
     period = TimePeriod(
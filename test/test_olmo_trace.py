@@ -9,34 +9,32 @@ Run with: uv run python test/test_olmo_trace.py
 """
 
 import os
+import sys
 import time
+from typing import Callable
 import httpx
 from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.resources import Resource, SERVICE_NAME
 from opentelemetry.trace import Status, StatusCode
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pulse.otel import init_otel, flush_otel, get_tracer
+
 # Config
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://primer:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "olmo-3:7b-instruct")
 OTEL_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://alpha-pi:4318")
 
-def setup_otel() -> trace.Tracer:
-    """Set up OTel with explicit configuration."""
-    resource = Resource.create({
-        SERVICE_NAME: "olmo-test",
-    })
-
-    provider = TracerProvider(resource=resource)
-
-    # SimpleSpanProcessor for immediate export (no batching)
-    exporter = OTLPSpanExporter(endpoint=f"{OTEL_ENDPOINT}/v1/traces")
-    provider.add_span_processor(SimpleSpanProcessor(exporter))
+# One keep-alive client for every OLMo call, so repeat calls reuse the connection
+_client = httpx.Client(
+    timeout=60,
+    limits=httpx.Limits(max_keepalive_connections=4, max_connections=8),
+)
 
-    trace.set_tracer_provider(provider)
-    return trace.get_tracer("olmo-test")
+def setup_otel() -> tuple[trace.Tracer, Callable[..., None]]:
+    """Set up OTel through Pulse's init_otel. Returns the tracer and a flush."""
+    init_otel(service_name="olmo-test")
+    return get_tracer("olmo-test"), flush_otel
 
 
 def call_olmo(tracer: trace.Tracer, prompt: str) -> str:
@@ -65,14 +63,13 @@ def call_olmo(tracer: trace.Tracer, prompt: str) -> str:
         print(f"Attributes set: gen_ai.system=ollama")
 
         try:
-            response = httpx.post(
+            response = _client.post(
                 f"{OLLAMA_URL}/api/generate",
                 json={
                     "model": OLLAMA_MODEL,
                     "prompt": prompt,
                     "stream": False,
                 },
-                timeout=60,
             )
             response.raise_for_status()
             result = response.json()
@@ -80,7 +77,8 @@ def call_olmo(tracer: trace.Tracer, prompt: str) -> str:
             output = result.get("response", "").strip()
 
             # Record output
-            span.set_attribute("output.value", output[:500] if len(output) > 500 else output)
+            if output:
+                span.set_attribute("output.value", output[:500])  # no-op slice when short
             if "eval_count" in result:
                 span.set_attribute("gen_ai.usage.output_tokens", result["eval_count"])
             if "prompt_eval_count" in result:
@@ -108,20 +106,21 @@ def main():
 
     # Set up OTel
     print("Setting up OpenTelemetry...")
-    tracer = setup_otel()
+    tracer, flush = setup_otel()
     print("OTel ready.")
     print()
 
     # Make the call
     print("Calling OLMo...")
-    result = call_olmo(tracer, "Hi, how are you? Please respond briefly.")
+    try:
+        result = call_olmo(tracer, "Hi, how are you? Please respond briefly.")
+    finally:
+        _client.close()
     print()
 
     # Force flush
     print("Flushing spans...")
-    provider = trace.get_tracer_provider()
-    if hasattr(provider, 'force_flush'):
-        provider.force_flush()
+    flush()
     print("Done!")
     print()
     print("Check Phoenix for a span named 'llm.olmo-3:7b-instruct' with test.marker='olmo-trace-test'")
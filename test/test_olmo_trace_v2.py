@@ -10,50 +10,39 @@ Run with: uv run python test/test_olmo_trace_v2.py
 """
 
 import os
+import sys
 import time
 import logging
+from typing import Callable
 import httpx
 from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor  # Changed from Simple
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.resources import Resource, SERVICE_NAME
 from opentelemetry.trace import Status, StatusCode
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pulse import otel as pulse_otel
+
 # Config
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://primer:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "olmo-3:7b-instruct")
 OTEL_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://alpha-pi:4318")
 
-# Module-level tracer (like Pulse)
-_tracer: trace.Tracer | None = None
-
-def init_otel():
-    """Initialize OTel - Pulse style."""
-    global _tracer
-
-    resource = Resource.create({
-        SERVICE_NAME: "olmo-test-v2",
-    })
-
-    provider = TracerProvider(resource=resource)
-
-    # BatchSpanProcessor like Pulse uses
-    exporter = OTLPSpanExporter(endpoint=f"{OTEL_ENDPOINT}/v1/traces")
-    provider.add_span_processor(BatchSpanProcessor(exporter))
-
-    trace.set_tracer_provider(provider)
-    _tracer = trace.get_tracer("olmo-test-v2")
+# One keep-alive client for every OLMo call, so repeat calls reuse the connection
+_client = httpx.Client(
+    timeout=60,
+    limits=httpx.Limits(max_keepalive_connections=4, max_connections=8),
+)
 
+def init_otel() -> Callable[..., None]:
+    """Initialize OTel - Pulse's own init_otel. Returns its flush."""
+    pulse_otel.init_otel(service_name="olmo-test-v2")
     print(f"OTel initialized: {OTEL_ENDPOINT}/v1/traces")
+    return pulse_otel.flush_otel
 
 
 def get_tracer() -> trace.Tracer:
-    """Get tracer - Pulse style."""
-    global _tracer
-    if _tracer is None:
-        _tracer = trace.get_tracer("olmo-test-v2")
-    return _tracer
+    """Get tracer - Pulse's cached one."""
+    return pulse_otel.get_tracer("olmo-test-v2")
 
 
 def call_olmo(prompt: str) -> str:
@@ -81,21 +70,21 @@ def call_olmo(prompt: str) -> str:
         print(f"Span: trace_id={span.get_span_context().trace_id:032x}, span_id={span.get_span_context().span_id:016x}")
 
         try:
-            response = httpx.post(
+            response = _client.post(
                 f"{OLLAMA_URL}/api/generate",
                 json={
                     "model": OLLAMA_MODEL,
                     "prompt": prompt,
                     "stream": False,
                 },
-                timeout=60,
             )
             response.raise_for_status()
             result = response.json()
 
             output = result.get("response", "").strip()
 
-            span.set_attribute("output.value", output[:500] if len(output) > 500 else output)
+            if output:
+                span.set_attribute("output.value", output[:500])  # no-op slice when short
             if "eval_count" in result:
                 span.set_attribute("gen_ai.usage.output_tokens", result["eval_count"])
             if "prompt_eval_count" in result:
@@ -116,18 +105,19 @@ def main():
     print("OLMo Trace Test v2 (BatchSpanProcessor + module tracer)")
     print("=" * 60)
 
-    init_otel()
+    flush = init_otel()
     print()
 
     print("Calling OLMo...")
-    call_olmo("What's 2 + 2? Answer briefly.")
+    try:
+        call_olmo("What's 2 + 2? Answer briefly.")
+    finally:
+        _client.close()
     print()
 
     # Force flush with BatchSpanProcessor
     print("Flushing spans (BatchSpanProcessor needs this)...")
-    provider = trace.get_tracer_provider()
-    if hasattr(provider, 'force_flush'):
-        provider.force_flush(timeout_millis=5000)
+    flush(timeout_millis=5000)
     print("Done! Check Phoenix for test.marker='olmo-trace-test-v2'")
 
 